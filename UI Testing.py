@@ -1,178 +1,32 @@
 import os
-import re
-import json
-import threading
-from pathlib import Path
-import pandas as pd
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
+from tkinter import filedialog, messagebox
 
-# --- External libraries ---
-import pdfplumber
-import easyocr
-from docx import Document
-import dateparser
-from dateparser.search import search_dates
-import spacy
-from spacy_download import load_spacy
-from pdf2image import convert_from_path
+from lease_analytics import RESULTS_JSONL, process_all_files
+from sinks import read_jsonl
+from tk_support import BackgroundJob, ProgressMeter, VirtualTable
 
-# Initialize
-reader = easyocr.Reader(['en', 'af']) # English + Afrikaans
-nlp = load_spacy("en_core_web_sm")
 
-# ----------------------------- Text extraction -----------------------------
-def extract_text_from_pdf(path: Path) -> str:
-    """Extract text from a PDF using pdfplumber, fallback to EasyOCR."""
-    text_chunks = []
-    try:
-        with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    text_chunks.append(text)
-    except Exception:
-        pass
+def table_row(r):
+    return (
+        r.get('file_name', ''),
+        r.get('health_score', ''),
+        ", ".join(r.get('parties', [])),
+        ", ".join(r.get('dates', [])),
+        ", ".join(r.get('monetary_values', [])),
+        " | ".join(r.get('clauses', {}).get('rent', []))[:100],
+        " | ".join(r.get('clauses', {}).get('deposit', []))[:100],
+        " | ".join(r.get('clauses', {}).get('termination', []))[:100],
+        ", ".join(r.get('compliance_flags', []))
+    )
 
-    text = "\n".join(text_chunks).strip()
-
-    # Use EasyOCR if no text extracted
-    if not text:
-        images = convert_from_path(str(path))
-        ocr_texts = []
-        for img in images:
-            result = reader.readtext(img)
-            page_text = " ".join([item[1] for item in result])
-            ocr_texts.append(page_text)
-        text = "\n".join(ocr_texts)
-    return text
-
-
-def extract_text_from_docx(path: Path) -> str:
-    doc = Document(str(path))
-    return "\n".join([p.text for p in doc.paragraphs])
-
-# ----------------------------- SA-specific regex -----------------------------
-DATE_REGEX = re.compile(r"\b\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4}\b")
-MONEY_REGEX = re.compile(r"\b(?:R|ZAR)?\s?\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?\b")
-
-CLAUSE_KEYWORDS = {
-    'rent': ['rent', 'monthly rental', 'base rent', 'huur'],
-    'deposit': ['security deposit', 'deposit', 'borg'],
-    'termination': ['termination', 'cancel', 'notice period', 'opzegging'],
-    'maintenance': ['maintenance', 'repair', 'landlord shall', 'tenant shall'],
-    'utilities': ['utilities', 'electricity', 'water', 'municipal rates'],
-    'law': ['Rental Housing Act', 'Consumer Protection Act', 'CPA', 'South African law'],
-    'governing_law': ['governing law', 'jurisdiction', 'South Africa']
-}
-
-# ----------------------------- Extraction logic -----------------------------
-def find_dates(text: str):
-    parsed = search_dates(text, settings={'DATE_ORDER': 'DMY'})
-    return list({d[1].date().isoformat() for d in parsed}) if parsed else []
-
-def find_money(text: str):
-    return list(set([m.group(0) for m in MONEY_REGEX.finditer(text)]))
-
-def extract_parties(text: str):
-    pattern = re.compile(r"between\s+(.*?)\s+and\s+(.*?)\s", re.I)
-    m = pattern.search(text[:2000])
-    if m:
-        return [m.group(1).strip(), m.group(2).strip()]
-    return []
-
-def clause_search(text: str, keywords: list):
-    text_lower = text.lower()
-    results = []
-    for kw in keywords:
-        if kw.lower() in text_lower:
-            start = max(0, text_lower.find(kw.lower()) - 100)
-            end = min(len(text), text_lower.find(kw.lower()) + 300)
-            results.append(text[start:end])
-    return results
-
-def extract_lease_fields(text: str) -> dict:
-    result = {
-        'dates': find_dates(text),
-        'monetary_values': find_money(text),
-        'parties': extract_parties(text),
-        'clauses': {},
-        'compliance_flags': []
-    }
-    for key, kws in CLAUSE_KEYWORDS.items():
-        result['clauses'][key] = clause_search(text, kws)
-
-    # Check deposit compliance
-    deposits = [float(re.sub(r'[^\d.]', '', val)) for val in result['monetary_values'] if 'R' in val or 'ZAR' in val]
-    if deposits:
-        max_deposit = max(deposits)
-        rent_candidates = [float(re.sub(r'[^\d.]', '', val)) for val in result['monetary_values']]
-        if rent_candidates and max_deposit > (2 * max(rent_candidates)):
-            result['compliance_flags'].append('Deposit exceeds 2 months rent')
-
-    # Ensure governing law is specified
-    if not result['clauses']['governing_law']:
-        result['compliance_flags'].append('Missing governing law clause')
-
-    return result
-
-def compute_health_score(extracted: dict) -> int:
-    score = 100
-    if not extracted['parties']:
-        score -= 15
-    if not extracted['clauses']['rent']:
-        score -= 20
-    if not extracted['clauses']['deposit']:
-        score -= 10
-    if not extracted['clauses']['termination']:
-        score -= 10
-    if 'Deposit exceeds 2 months rent' in extracted['compliance_flags']:
-        score -= 15
-    if 'Missing governing law clause' in extracted['compliance_flags']:
-        score -= 10
-    return max(0, score)
-
-# ----------------------------- Processing -----------------------------
-def process_file(path: Path):
-    ext = path.suffix.lower()
-    if ext == '.pdf':
-        text = extract_text_from_pdf(path)
-    elif ext == '.docx':
-        text = extract_text_from_docx(path)
-    else:
-        text = path.read_text(encoding='utf-8', errors='ignore')
-
-    extracted = extract_lease_fields(text)
-    extracted['file_name'] = path.name
-    extracted['health_score'] = compute_health_score(extracted)
-    return extracted
-
-def process_all_files(input_folder, output_folder, progress_callback=None):
-    in_path = Path(input_folder)
-    out_path = Path(output_folder)
-    out_path.mkdir(parents=True, exist_ok=True)
-
-    results = []
-    files = [p for p in in_path.iterdir() if p.is_file() and p.suffix.lower() in ['.pdf', '.docx', '.txt']]
-    for i, p in enumerate(files):
-        if progress_callback:
-            progress_callback(f"Processing: {p.name}")
-        data = process_file(p)
-        results.append(data)
-        with open(out_path / (p.stem + '.json'), 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-
-    df = pd.DataFrame(results)
-    df.to_csv(out_path / 'summary.csv', index=False)
-    if progress_callback:
-        progress_callback(f"Processing complete! {len(results)} files analyzed.")
-    return df
 
 # ----------------------------- Tkinter GUI -----------------------------
 class LeaseAnalyticsGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("South African Lease Analytics Tool")
+        self.job = None
 
         # Heading
         tk.Label(root, text="South African Lease Analytics Tool", font=("Arial", 16, "bold")).pack(pady=10)
@@ -197,25 +51,30 @@ class LeaseAnalyticsGUI:
         self.status_var = tk.StringVar(value="Idle")
         tk.Label(root, textvariable=self.status_var, fg="blue").pack(pady=5)
 
-        # Start button
-        tk.Button(root, text="Start Processing", command=self.start_processing, bg="green", fg="white").pack(pady=10)
+        # Progress
+        self.progress = ProgressMeter(root)
+        self.progress.frame.pack(pady=5)
+
+        # Incremental mode
+        self.incremental_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(root, text="Only process new or changed files", variable=self.incremental_var).pack()
+
+        # Start / cancel buttons
+        frame_buttons = tk.Frame(root)
+        frame_buttons.pack(pady=10)
+        self.start_button = tk.Button(frame_buttons, text="Start Processing", command=self.start_processing,
+                                      bg="green", fg="white")
+        self.start_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = tk.Button(frame_buttons, text="Cancel", command=self.cancel_processing,
+                                       state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
 
         # Table for results
         self.table_columns = (
             "File", "Health Score", "Parties", "Dates", "Monetary Values",
             "Rent Clause", "Deposit Clause", "Termination Clause", "Compliance Flags"
         )
-        self.table = ttk.Treeview(root, columns=self.table_columns, show="headings", height=12)
-
-        for col in self.table_columns:
-            self.table.heading(col, text=col)
-            self.table.column(col, anchor=tk.W, width=150)
-
-        # Horizontal scrollbar
-        scroll_x = ttk.Scrollbar(root, orient="horizontal", command=self.table.xview)
-        self.table.configure(xscrollcommand=scroll_x.set)
-        scroll_x.pack(fill=tk.X, side=tk.BOTTOM)
-
+        self.table = VirtualTable(root, self.table_columns, height=12, width=150, anchor=tk.W)
         self.table.pack(fill=tk.BOTH, expand=True, pady=10)
 
     def select_input_folder(self):
@@ -235,33 +94,57 @@ class LeaseAnalyticsGUI:
         if not input_folder or not output_folder:
             messagebox.showerror("Error", "Please select both input and output folders")
             return
+        if self.job and self.job.running:
+            return
 
-        threading.Thread(target=self.run_processing, args=(input_folder, output_folder), daemon=True).start()
-
-    def run_processing(self, input_folder, output_folder):
-        def update_status(msg):
-            self.status_var.set(msg)
-            self.root.update_idletasks()
-
-        df = process_all_files(input_folder, output_folder, progress_callback=update_status)
-
-        # Clear old table rows
-        for row in self.table.get_children():
-            self.table.delete(row)
-
-        # Insert new rows
-        for _, r in df.iterrows():
-            self.table.insert("", tk.END, values=(
-                r.get('file_name', ''),
-                r.get('health_score', ''),
-                ", ".join(r.get('parties', [])),
-                ", ".join(r.get('dates', [])),
-                ", ".join(r.get('monetary_values', [])),
-                " | ".join(r.get('clauses', {}).get('rent', []))[:100],
-                " | ".join(r.get('clauses', {}).get('deposit', []))[:100],
-                " | ".join(r.get('clauses', {}).get('termination', []))[:100],
-                ", ".join(r.get('compliance_flags', []))
-            ))
+        incremental = self.incremental_var.get()
+        self.table.clear()
+        self.start_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.job = BackgroundJob(self.root, lambda post, cancel: self.run_processing(
+            post, cancel, input_folder, output_folder, incremental), self.apply_messages)
+        self.job.start()
+
+    def cancel_processing(self):
+        if self.job:
+            self.job.cancel()
+            self.status_var.set("Cancelling after the files in progress...")
+
+    def run_processing(self, post, cancel, input_folder, output_folder, incremental=False):
+        """Runs on the worker thread; only talks to the window through `post`."""
+        process_all_files(input_folder, output_folder,
+                          progress_callback=lambda msg: post('status', msg),
+                          on_result=lambda r: post('row', table_row(r)),
+                          on_progress=lambda done, total: post('progress', (done, total)),
+                          incremental=incremental, cancel=cancel)
+        # Show the whole summary, including results kept from earlier incremental runs
+        if not cancel.is_set():
+            post('rows', [table_row(r) for r in read_jsonl(os.path.join(output_folder, RESULTS_JSONL))])
+
+    def apply_messages(self, messages):
+        """Runs on the Tk main loop with a batch of messages from the worker."""
+        new_rows = []
+        for kind, payload in messages:
+            if kind == 'row':
+                new_rows.append(payload)
+            elif kind == 'rows':
+                new_rows = []
+                self.table.set_rows(payload)
+            elif kind == 'status':
+                self.status_var.set(payload)
+            elif kind == 'progress':
+                done, total = payload
+                if done == 0:
+                    self.progress.start(total)
+                else:
+                    self.progress.update(done)
+            elif kind == 'error':
+                messagebox.showerror("Error", payload)
+            elif kind == 'finished':
+                self.start_button.config(state=tk.NORMAL)
+                self.cancel_button.config(state=tk.DISABLED)
+        if new_rows:
+            self.table.append_rows(new_rows)
 
 
 # ----------------------------- Main -----------------------------
@@ -270,4 +153,3 @@ if __name__ == "__main__":
     app = LeaseAnalyticsGUI(root)
     root.geometry("900x600")
     root.mainloop()
-
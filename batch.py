@@ -0,0 +1,167 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import models
+
+# ----------------------------- Parallel batch engine -----------------------------
+# Files are processed by a pool of worker processes. Every worker keeps its own OCR
+# reader warm through the model registry, so only the first scanned page a worker
+# sees pays for loading it.
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+# Options such as the budgets, the OCR tier or a disabled cache are module globals that
+# set_*() functions change in the parent. Forked workers inherit them, but spawned ones
+# (the default on Windows and macOS) import every module afresh and would run with the
+# defaults, so every pool hands its workers a snapshot of the registered settings.
+_worker_settings = []  # (get, apply) pairs, see worker_setting()
+
+
+def worker_setting(get, apply):
+    """Copy a process-wide setting into every worker that open_pool() starts.
+
+    get() reads the setting in the parent when the pool is opened; each worker calls
+    apply(value) on start. `apply` must be a module-level function so it can be pickled.
+    """
+    _worker_settings.append((get, apply))
+
+
+def worker_settings() -> list:
+    """(apply, value) for every registered setting, as _init_worker() applies them."""
+    return [(apply, get()) for get, apply in _worker_settings]
+
+
+def _init_worker(preload_ocr, gpu, settings=()):
+    for apply, value in settings:
+        apply(value)
+    if preload_ocr:
+        models.preload(preload_ocr, gpu=gpu)
+
+
+def open_pool(workers=None, preload_ocr=None, gpu=False) -> ProcessPoolExecutor:
+    """A process pool whose workers take this process's settings (see worker_setting())
+    and load the OCR reader for `preload_ocr` languages on start."""
+    return ProcessPoolExecutor(max_workers=workers or default_workers(), initializer=_init_worker,
+                               initargs=(preload_ocr, gpu, worker_settings()))
+
+
+def run_batch(func, items, workers=None, max_pending=None, preload_ocr=None, gpu=False, cancel=None):
+    """Yield (index, item, result) for every item in completion order.
+
+    Only items within `max_pending` (default 2x workers) of the oldest unfinished one are
+    in flight at a time, so memory stays bounded even when one slow file holds up the
+    front of the queue. The result is None when `func` raised; the error is printed and
+    the batch carries on. `preload_ocr` is a tuple of OCR languages to load in every
+    worker up front instead of on first use. Setting the `cancel` event stops the batch:
+    queued items are dropped and only items already running are waited for.
+
+    A worker that dies (killed for running out of memory, a crash in native code) takes
+    down the whole pool and every item in flight with it. The pool is then replaced and
+    those items are retried one at a time; the one that kills its worker again gets
+    None as its result, and the rest of the batch carries on.
+    """
+    items = list(items)
+    workers = min(workers or default_workers(), max(len(items), 1))
+
+    if workers <= 1:
+        for index, item in enumerate(items):
+            if cancel is not None and cancel.is_set():
+                return
+            yield index, item, _call(func, item)
+        return
+
+    max_pending = max_pending or 2 * workers
+    pool = open_pool(workers, preload_ocr, gpu)
+    try:
+        in_flight = {}
+        finished = set()
+        suspects = []  # items in flight when a worker died, retried alone
+        retried = set()
+        oldest = 0  # lowest index not finished yet
+        next_index = 0
+        while next_index < len(items) or in_flight or suspects:
+            if cancel is not None and cancel.is_set():
+                for future in in_flight:
+                    future.cancel()
+                return
+            try:
+                if suspects:
+                    # Alone in the pool, so a second death is pinned on the right item
+                    if not in_flight:
+                        in_flight[pool.submit(func, items[suspects[0]])] = suspects[0]
+                        retried.add(suspects.pop(0))
+                else:
+                    while next_index < len(items) and next_index < oldest + max_pending:
+                        in_flight[pool.submit(func, items[next_index])] = next_index
+                        next_index += 1
+            except BrokenProcessPool:
+                # A worker died since the last wait; the items in flight report it below
+                if not in_flight:
+                    pool = replace_pool(pool, workers, preload_ocr, gpu)
+                    continue
+
+            # Wake up regularly so a cancel is noticed while long files are running
+            done, _ = wait(in_flight, timeout=0.5, return_when=FIRST_COMPLETED)
+            broken = any(isinstance(future.exception(), BrokenProcessPool) for future in done)
+            if broken:
+                done, _ = wait(in_flight)  # every other item in flight fails with it
+            for future in done:
+                index = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    if index not in retried:
+                        suspects.append(index)
+                        continue
+                    print(f"[ERROR] Worker died while processing: {items[index]}\n{e}")
+                    result = None
+                except Exception as e:
+                    print(f"[ERROR] Failed to process: {items[index]}\n{e}")
+                    result = None
+                finished.add(index)
+                yield index, items[index], result
+            if broken:
+                suspects.sort()
+                pool = replace_pool(pool, workers, preload_ocr, gpu)
+
+            while oldest in finished:
+                finished.remove(oldest)
+                oldest += 1
+    finally:
+        pool.shutdown()
+
+
+def replace_pool(pool, workers=None, preload_ocr=None, gpu=False) -> ProcessPoolExecutor:
+    """Shut down a pool broken by a dead worker and open a fresh one like it."""
+    print("[ERROR] A worker process died; restarting the pool")
+    pool.shutdown(wait=False, cancel_futures=True)
+    return open_pool(workers, preload_ocr, gpu)
+
+
+def _call(func, item):
+    try:
+        return func(item)
+    except Exception as e:
+        print(f"[ERROR] Failed to process: {item}\n{e}")
+        return None
+
+
+class Reorder:
+    """Release results that arrive in completion order back in input order."""
+
+    def __init__(self):
+        self.next_index = 0
+        self.pending = {}
+
+    def push(self, index, value):
+        """Add the result for `index`; returns every value that is now next in line."""
+        self.pending[index] = value
+        released = []
+        while self.next_index in self.pending:
+            released.append(self.pending.pop(self.next_index))
+            self.next_index += 1
+        return released
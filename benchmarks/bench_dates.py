@@ -0,0 +1,112 @@
+"""Speed and recall of find_dates against running search_dates over the whole text.
+
+The baseline is the original find_dates. Recall is the share of baseline dates that
+find_dates also returns, over the whole corpus; dates only one side found are listed.
+On the synthetic corpus, the share of the planted dates each side finds is reported
+too: search_dates also reports words like "may" as dates, which inflates its side.
+
+    python benchmarks/bench_dates.py                  # synthetic lease corpus
+    python benchmarks/bench_dates.py leases/*.txt     # your own sample corpus
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dateparser.search import search_dates  # noqa: E402
+
+import lease_analytics  # noqa: E402
+
+
+def baseline_find_dates(text):
+    parsed = search_dates(text, settings={'DATE_ORDER': 'DMY'})
+    return list({d[1].date().isoformat() for d in parsed}) if parsed else []
+
+
+MONTHS_EN = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+             "November", "December"]
+MONTHS_AF = ["Januarie", "Februarie", "Maart", "April", "Mei", "Junie", "Julie", "Augustus", "September",
+             "Oktober", "November", "Desember"]
+FORMATS = [
+    lambda d, m, y: f"{d:02d}/{m:02d}/{y}",
+    lambda d, m, y: f"{y}-{m:02d}-{d:02d}",
+    lambda d, m, y: f"{d} {MONTHS_EN[m - 1]} {y}",
+    lambda d, m, y: f"{MONTHS_EN[m - 1]} {d}, {y}",
+    lambda d, m, y: f"{d} {MONTHS_AF[m - 1]} {y}",
+]
+CLAUSES = [
+    "The Tenant shall pay the monthly rental in advance on or before the first day of each month.",
+    "The Landlord shall maintain the exterior of the premises in good repair.",
+    "Either party may cancel this agreement on one calendar month's written notice.",
+    "Die Huurder sal die huur maandeliks vooruit betaal.",
+    "The security deposit shall be held in an interest bearing account.",
+]
+
+
+def synthetic_corpus(documents=20, paragraphs=200, seed=11):
+    """[(text, planted ISO dates)] for `documents` synthetic leases."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(documents):
+        parts = []
+        planted = set()
+        for _ in range(paragraphs):
+            parts.append(rng.choice(CLAUSES))
+            if rng.random() < 0.1:
+                d, m, y = rng.randint(1, 28), rng.randint(1, 12), rng.randint(2015, 2030)
+                parts.append(f"This lease commences on {rng.choice(FORMATS)(d, m, y)}.")
+                planted.add(f"{y}-{m:02d}-{d:02d}")
+        corpus.append((" ".join(parts), planted))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="text files to use as the sample corpus")
+    args = parser.parse_args()
+
+    if args.files:
+        corpus = [(open(path, encoding="utf-8", errors="ignore").read(), None) for path in args.files]
+    else:
+        corpus = synthetic_corpus()
+
+    totals = {"baseline": 0.0, "tiered": 0.0}
+    found = missed = 0
+    extra = set()
+    planted_hits = {"baseline": 0, "tiered": 0}
+    planted_total = 0
+    for text, planted in corpus:
+        t0 = time.perf_counter()
+        base = set(baseline_find_dates(text))
+        t1 = time.perf_counter()
+        new = set(lease_analytics.find_dates(text))
+        t2 = time.perf_counter()
+        totals["baseline"] += t1 - t0
+        totals["tiered"] += t2 - t1
+        found += len(base & new)
+        missed += len(base - new)
+        extra |= new - base
+        if planted is not None:
+            planted_total += len(planted)
+            planted_hits["baseline"] += len(planted & base)
+            planted_hits["tiered"] += len(planted & new)
+        if base - new:
+            print("missed:", ", ".join(sorted(base - new)))
+
+    print(f"{len(corpus)} documents")
+    for name, seconds in totals.items():
+        print(f"{name:9} {seconds:8.2f}s  {seconds / len(corpus) * 1000:8.1f} ms/doc")
+    print(f"speedup   {totals['baseline'] / totals['tiered']:.1f}x")
+    print(f"recall    {found / max(found + missed, 1):.3f}  ({found} of {found + missed} baseline dates)")
+    if extra:
+        print(f"found only by tiered extractor: {len(extra)}")
+    if planted_total:
+        print("planted   " + "   ".join(f"{name} {hits / planted_total:.3f}" for name, hits in planted_hits.items())
+              + f"  (of {planted_total} planted dates)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Peak-memory benchmark: whole-document rasterization versus page streaming.
+
+Each run happens in a fresh interpreter and reports its peak RSS. With streaming,
+peak memory should stay flat as the page count grows; with eager rasterization it
+grows linearly.
+
+    python benchmarks/bench_ocr_memory.py scanned.pdf            # measure a real PDF
+    python benchmarks/bench_ocr_memory.py --pages 10 50 200      # synthetic scans (needs Pillow)
+    python benchmarks/bench_ocr_memory.py scanned.pdf --ocr      # include EasyOCR itself
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+from pdf2image import convert_from_path
+from ocr import iter_pdf_pages, preprocess_image
+from models import get_ocr_reader
+
+reader = get_ocr_reader(("en",)) if {ocr!r} else None
+t0 = time.perf_counter()
+pages = 0
+if {mode!r} == "eager":
+    images = convert_from_path({path!r})
+    for image in images:
+        if reader:
+            reader.readtext(preprocess_image(image))
+        pages += 1
+else:
+    for _, image in iter_pdf_pages({path!r}):
+        if reader:
+            reader.readtext(preprocess_image(image))
+        image.close()
+        pages += 1
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"pages": pages, "seconds": elapsed,
+                  "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+
+def make_scanned_pdf(path, pages):
+    from PIL import Image, ImageDraw
+
+    def page(number):
+        image = Image.new("L", (1654, 2339), 255)  # A4 at 200 DPI
+        draw = ImageDraw.Draw(image)
+        for line in range(60):
+            draw.text((100, 100 + line * 36), f"Page {number} line {line}: the tenant shall pay the rent", fill=0)
+        return image
+
+    # Pages are generated while saving so the fixture itself never sits in memory
+    rest = (page(number) for number in range(2, pages + 1))
+    page(1).save(path, save_all=True, append_images=rest, resolution=200)
+
+
+def measure(path, mode, ocr):
+    code = CHILD.format(root=REPO_ROOT, path=path, mode=mode, ocr=ocr)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=REPO_ROOT)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1])
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def report(label, path, ocr):
+    for mode in ("eager", "stream"):
+        try:
+            r = measure(path, mode, ocr)
+        except RuntimeError as e:
+            print(f"{label:>24} {mode:6} failed: {e}")
+            continue
+        print(f"{label:>24} {mode:6} {r['pages']:5d} pages  {r['seconds']:8.2f}s  "
+              f"peak RSS {r['max_rss_kb'] / 1024:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="*", help="scanned PDFs to measure")
+    parser.add_argument("--pages", type=int, nargs="*", default=[], help="generate synthetic scans of these sizes")
+    parser.add_argument("--ocr", action="store_true", help="also run EasyOCR on every page")
+    args = parser.parse_args()
+
+    for path in args.pdfs:
+        report(os.path.basename(path), path, args.ocr)
+
+    if args.pages:
+        with tempfile.TemporaryDirectory() as tmp:
+            for pages in args.pages:
+                path = os.path.join(tmp, f"synthetic_{pages}.pdf")
+                make_scanned_pdf(path, pages)
+                report(f"synthetic {pages}p", path, args.ocr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Pages per second and character accuracy of each OCR tier.
+
+A fixture is a scanned PDF with a .txt file of the same name holding its true text.
+Accuracy is the share of the true text's characters that the OCR output reproduces in
+order (whitespace collapsed), over the whole fixture set. Model loading is excluded
+from the timings.
+
+    python benchmarks/bench_ocr_tiers.py                       # synthetic scans (needs Pillow)
+    python benchmarks/bench_ocr_tiers.py fixtures/             # your own PDF + .txt pairs
+    python benchmarks/bench_ocr_tiers.py --tiers fast balanced --languages en af
+"""
+import argparse
+import difflib
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import get_ocr_reader  # noqa: E402
+from ocr import OCR_TIERS, ocr_pdf_pages  # noqa: E402
+
+WORDS = ("the tenant shall pay landlord rental deposit premises month notice agreement party "
+         "lease term renewal clause schedule annexure signed witness").split()
+
+
+def synthetic_line(rng):
+    kind = rng.random()
+    if kind < 0.1:
+        return f"ID number: {rng.randint(10, 99)}0{rng.randint(1, 9)}{rng.randint(10, 28)} {rng.randint(1000, 9999)} 08{rng.randint(1, 9)}"
+    if kind < 0.2:
+        return f"Contact: {rng.choice(WORDS)}.{rng.choice(WORDS)}@example.co.za  082 {rng.randint(100, 999)} {rng.randint(1000, 9999)}"
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 10))).capitalize() + "."
+
+
+def make_fixtures(directory, documents=3, pages=4, seed=3):
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 28)
+    except OSError:
+        font = ImageFont.load_default()
+    rng = random.Random(seed)
+    paths = []
+    for doc in range(documents):
+        images, truth = [], []
+        for _ in range(pages):
+            image = Image.new("L", (1654, 2339), 255)  # A4 at 200 DPI
+            draw = ImageDraw.Draw(image)
+            for line in range(40):
+                text = synthetic_line(rng)
+                draw.text((120, 120 + line * 52), text, fill=rng.randint(0, 60), font=font)
+                truth.append(text)
+            # A little blur and speckle so the page looks scanned
+            image = image.filter(ImageFilter.GaussianBlur(0.6))
+            for _ in range(3000):
+                image.putpixel((rng.randrange(1654), rng.randrange(2339)), rng.randint(120, 255))
+            images.append(image)
+        path = os.path.join(directory, f"scan_{doc + 1}.pdf")
+        images[0].save(path, save_all=True, append_images=images[1:], resolution=200)
+        with open(path[:-4] + ".txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(truth))
+        paths.append(path)
+    return paths
+
+
+def normalize(text):
+    return " ".join(text.split())
+
+
+def matched_chars(truth, text):
+    matcher = difflib.SequenceMatcher(None, truth, text, autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fixtures", nargs="?", help="folder of scanned PDFs with matching .txt ground truth")
+    parser.add_argument("--tiers", nargs="+", choices=list(OCR_TIERS), default=list(OCR_TIERS))
+    parser.add_argument("--languages", nargs="+", default=["en"])
+    parser.add_argument("--gpu", action="store_true")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        pdfs = sorted(p for p in glob.glob(os.path.join(args.fixtures, "*.pdf")) if os.path.exists(p[:-4] + ".txt"))
+    else:
+        pdfs = make_fixtures(tempfile.mkdtemp())
+    if not pdfs:
+        sys.exit("No PDF fixtures with a matching .txt file found")
+    truths = {}
+    for path in pdfs:
+        with open(path[:-4] + ".txt", encoding="utf-8") as f:
+            truths[path] = normalize(f.read())
+
+    get_ocr_reader(args.languages, gpu=args.gpu)
+    print(f"{len(pdfs)} fixtures, languages {', '.join(args.languages)}")
+    for name in args.tiers:
+        pages = matched = expected = 0
+        elapsed = 0.0
+        for path in pdfs:
+            t0 = time.perf_counter()
+            texts = [text for _, text in ocr_pdf_pages(path, args.languages, gpu=args.gpu, tier=name)]
+            elapsed += time.perf_counter() - t0
+            pages += len(texts)
+            matched += matched_chars(truths[path], normalize(" ".join(texts)))
+            expected += len(truths[path])
+        print(f"{name:9} {pages / elapsed:7.2f} pages/s  {elapsed:8.1f}s  accuracy {matched / max(expected, 1):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Speed and coverage of the OOXML extractor against the python-docx/python-pptx loops.
+
+The baselines are the original .docx and .pptx branches of read_file. Coverage is the
+number of characters each side extracts; every baseline line must also appear in the
+OOXML output. Needs python-docx and python-pptx to build the synthetic documents.
+
+    python benchmarks/bench_ooxml.py                      # synthetic large .docx and .pptx
+    python benchmarks/bench_ooxml.py contracts/*.docx     # your own sample documents
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx  # noqa: E402
+from pptx import Presentation  # noqa: E402
+from pptx.util import Inches  # noqa: E402
+
+import ooxml  # noqa: E402
+
+
+def baseline_docx(path):
+    doc = docx.Document(path)
+    return '\n'.join([para.text for para in doc.paragraphs])
+
+
+def baseline_pptx(path):
+    text = ""
+    prs = Presentation(path)
+    for slide in prs.slides:
+        for shape in slide.shapes:
+            if hasattr(shape, "text"):
+                text += shape.text + '\n'
+    return text
+
+
+WORDS = ("the tenant shall pay landlord rental deposit premises month notice agreement party "
+         "lease term renewal clause schedule annexure signed witness").split()
+
+
+def sentence(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+
+def synthetic_docx(path, paragraphs=20000, tables=200, seed=5):
+    rng = random.Random(seed)
+    doc = docx.Document()
+    doc.sections[0].header.paragraphs[0].text = "Lease between Acme Properties and J. Smith"
+    doc.sections[0].footer.paragraphs[0].text = "Tenant ID 8001015009087"
+    for i in range(paragraphs):
+        doc.add_paragraph(sentence(rng))
+        if i % (paragraphs // tables) == 0:
+            table = doc.add_table(rows=3, cols=3)
+            for cell in table._cells:
+                cell.text = rng.choice(WORDS)
+    doc.save(path)
+
+
+def synthetic_pptx(path, slides=500, seed=5):
+    rng = random.Random(seed)
+    prs = Presentation()
+    for _ in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = sentence(rng)
+        slide.placeholders[1].text = "\n".join(sentence(rng) for _ in range(5))
+        table = slide.shapes.add_table(2, 3, Inches(1), Inches(5), Inches(6), Inches(1)).table
+        for cell in (table.cell(r, c) for r in range(2) for c in range(3)):
+            cell.text = rng.choice(WORDS)
+        slide.notes_slide.notes_text_frame.text = sentence(rng)
+    prs.save(path)
+
+
+def measure(func, path, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        text = func(path)
+        best = min(best, time.perf_counter() - t0)
+    return best, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help=".docx/.pptx files to use instead of synthetic ones")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per file; the fastest is reported")
+    args = parser.parse_args()
+
+    files = args.files
+    if not files:
+        tmp = tempfile.mkdtemp()
+        files = [os.path.join(tmp, "large.docx"), os.path.join(tmp, "large.pptx")]
+        synthetic_docx(files[0])
+        synthetic_pptx(files[1])
+
+    for path in files:
+        is_docx = path.lower().endswith(".docx")
+        base_time, base_text = measure(baseline_docx if is_docx else baseline_pptx, path, args.repeat)
+        new_time, new_text = measure(ooxml.docx_text if is_docx else ooxml.pptx_text, path, args.repeat)
+        new_lines = set(new_text.splitlines())
+        missing = [line for line in base_text.splitlines() if line and line not in new_lines]
+        print(f"{os.path.basename(path)}  ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+        print(f"  object model {base_time:8.3f}s  {len(base_text):>10} chars")
+        print(f"  ooxml        {new_time:8.3f}s  {len(new_text):>10} chars")
+        print(f"  speedup      {base_time / new_time:.1f}x")
+        if missing:
+            print(f"  baseline lines missing from ooxml output: {len(missing)}, e.g. {missing[0]!r}")
+
+
+if __name__ == "__main__":
+    main()
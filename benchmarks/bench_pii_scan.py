@@ -0,0 +1,85 @@
+"""Throughput benchmark for search_patterns_in_text against the original per-pattern loops.
+
+The original implementation is kept here verbatim as the baseline. Both are run on the
+same synthetic text, their outputs are compared, and throughput is reported in MB/s.
+
+    python benchmarks/bench_pii_scan.py --mb 5 --repeat 3
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import keywords  # noqa: E402
+import pii_scan  # noqa: E402
+from pii_scan import (ID_PATTERN, PASSPORT_PATTERN, CELLPHONE_PATTERN, LANDLINE_PATTERN,  # noqa: E402
+                      EMAIL_PATTERN, IPV4_IPV6_PATTERN, GENDER_PATTERN, countries, race_keywords)
+
+
+def baseline_search_patterns_in_text(text):
+    text_lower = text.lower()
+    id_numbers = [re.sub(r'[-.,#$%&\s]', '', match[0]) for match in re.findall(ID_PATTERN, text)]
+    passport_matches = re.findall(PASSPORT_PATTERN, text)
+    cellphone_numbers = re.findall(CELLPHONE_PATTERN, text)
+    landline_numbers = re.findall(LANDLINE_PATTERN, text)
+    email_matches = re.findall(EMAIL_PATTERN, text)
+    ip_matches = re.findall(IPV4_IPV6_PATTERN, text)
+    matched_countries = [country for country in countries if country.lower() in text_lower]
+    gender_matches = re.findall(GENDER_PATTERN, text)
+    matched_races = [race for race in race_keywords if race.lower() in text_lower]
+    return dict(zip(pii_scan.CATEGORIES, [id_numbers, passport_matches, cellphone_numbers, landline_numbers,
+                                          email_matches, ip_matches, matched_countries, gender_matches,
+                                          matched_races]))
+
+
+FILLER = ("the tenant shall pay the monthly rental to the landlord on the first day of each month and the "
+          "security deposit will be held in an interest bearing account until termination of this lease").split()
+PII = ["8001015009087", "800101 5009 087", "A12345678", "082 555 1234", "+27 11 555 1234", "jan.smit@example.co.za",
+       "192.168.10.1", "2001:db8:0:0:0:ff00:42:8329", "South Africa", "Namibia", "Female", "Male", "black", "white"]
+
+
+def make_text(megabytes, density, seed=7):
+    rng = random.Random(seed)
+    words, size = [], 0
+    while size < megabytes * 1024 * 1024:
+        word = rng.choice(PII) if rng.random() < density else rng.choice(FILLER)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def timed(func, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=5.0, help="size of the synthetic text")
+    parser.add_argument("--density", type=float, default=0.01, help="fraction of words that are PII")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = make_text(args.mb, args.density)
+    mb = len(text.encode("utf-8")) / 1024 / 1024
+    engine = "pyahocorasick" if keywords.ahocorasick else "trie regex"
+    print(f"{mb:.1f} MB of text, PII density {args.density}, keyword engine: {engine}")
+
+    base_s, base = timed(baseline_search_patterns_in_text, text, args.repeat)
+    new_s, new = timed(pii_scan.search_patterns_in_text, text, args.repeat)
+    print(f"baseline  {base_s:7.3f}s  {mb / base_s:8.2f} MB/s")
+    print(f"scanner   {new_s:7.3f}s  {mb / new_s:8.2f} MB/s  ({base_s / new_s:.2f}x)")
+    print("outputs identical" if base == new else "OUTPUTS DIFFER: " + ", ".join(
+        c for c in pii_scan.CATEGORIES if base[c] != new[c]))
+
+
+if __name__ == "__main__":
+    main()
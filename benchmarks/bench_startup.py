@@ -0,0 +1,73 @@
+"""Startup-time benchmark: lazy model loading versus loading everything up front.
+
+Each measurement runs in a fresh interpreter so import caches do not leak between
+runs. "lazy" imports the tool the way a launch or a scripted import does today;
+"eager" additionally preloads the OCR reader, which is what every launch paid
+before models were loaded on demand.
+
+    python benchmarks/bench_startup.py --repeat 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import importlib.util, json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+spec = importlib.util.spec_from_file_location("tool_under_test", {path!r})
+mod = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(mod)
+t1 = time.perf_counter()
+if {eager!r}:
+    import models
+    models.preload(mod.OCR_LANGUAGES, gpu=getattr(mod, "OCR_GPU", False))
+t2 = time.perf_counter()
+try:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:
+    rss_kb = None
+print(json.dumps({{"import_s": t1 - t0, "total_s": t2 - t0, "max_rss_kb": rss_kb}}))
+"""
+
+TOOLS = {
+    "lease": "lease_analytics.py",
+    "pii": "pii_scan.py",
+}
+
+
+def measure(path, eager):
+    code = CHILD.format(root=REPO_ROOT, path=path, eager=eager)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=REPO_ROOT)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip())
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tool", choices=sorted(TOOLS), action="append")
+    args = parser.parse_args()
+
+    for name in args.tool or sorted(TOOLS):
+        path = os.path.join(REPO_ROOT, TOOLS[name])
+        for mode, eager in (("lazy", False), ("eager", True)):
+            try:
+                runs = [measure(path, eager) for _ in range(args.repeat)]
+            except RuntimeError as e:
+                print(f"{name:8} {mode:6} failed: {str(e).splitlines()[-1]}")
+                continue
+            total = statistics.median(r["total_s"] for r in runs)
+            rss = max(r["max_rss_kb"] or 0 for r in runs) / 1024
+            print(f"{name:8} {mode:6} startup {total:7.3f}s  peak RSS {rss:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
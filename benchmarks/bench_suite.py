@@ -0,0 +1,269 @@
+"""Throughput, latency, memory and recall of the PII and lease pipelines on a synthetic corpus.
+
+Each task runs in a fresh interpreter with the extraction cache off, one file at a
+time, so latencies and peak memory are comparable between runs. One file per format
+is processed first as a warm-up (imports, OCR model loading) and not counted. Recall
+is the share of the values corpus.py planted that the pipeline reports: PII for the
+pii task, dates and Rand amounts for the lease task.
+
+Save a run on one commit and compare against it on another; use the same corpus
+folder for both so the documents are identical:
+
+    python benchmarks/corpus.py /tmp/corpus --documents 50 --formats txt docx pdf
+    git checkout main && python benchmarks/bench_suite.py /tmp/corpus --save main.json
+    git checkout my-branch && python benchmarks/bench_suite.py /tmp/corpus --compare main.json
+
+Without a corpus folder a small one is generated in a temporary folder; a folder
+without corpus.json is generated there first, with the corpus options given.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpus as corpus_module  # noqa: E402
+
+TASKS = ('pii', 'lease')
+
+
+# ----------------------------- Worker side -----------------------------
+def run_task(task, paths, warm_up, repeat, ocr_tier):
+    """Process `paths` one by one in this (fresh) process; returns (records, peak RSS in MB).
+
+    The `warm_up` files are processed once first and not measured.
+    """
+    from cache import set_cache
+    from metrics import measured, peak_rss_mb
+
+    set_cache(None)
+    if task == 'pii':
+        import pii_scan
+        pii_scan.set_ocr_tier(ocr_tier)
+        func = pii_scan.process_single_file
+    else:
+        import lease_analytics
+        func = lease_analytics.process_file
+
+    for path in warm_up:
+        try:
+            func(path)
+        except Exception:
+            pass
+
+    run = measured(func)
+    records = []
+    for path in paths:
+        best = None
+        try:
+            for _ in range(repeat):
+                out = run(path)
+                if best is None or out['metrics']['seconds'] < best['metrics']['seconds']:
+                    best = out
+        except Exception as e:
+            records.append({'path': path, 'error': str(e)})
+            continue
+        if best['result'].get('error'):  # pii_scan reports read failures in the result
+            records.append({'path': path, 'error': best['result']['error']})
+            continue
+        records.append({'path': path, 'seconds': best['metrics']['seconds'], 'stages': best['metrics']['stages'],
+                        'result': found_values(task, best['result'])})
+    return records, peak_rss_mb()
+
+
+def found_values(task, result):
+    """The parts of a pipeline result that recall is measured on, normalized."""
+    if task == 'pii':
+        matches = result.get('matches') or {}
+        return {kind: sorted({_normalize(v) for v in matches.get(category) or []})
+                for kind, category in corpus_module.PII_KINDS.items()}
+    return {'dates': sorted(result.get('dates') or []),
+            'money': sorted({_normalize(v) for v in result.get('monetary_values') or []})}
+
+
+def _normalize(value):
+    return re.sub(r'\W', '', str(value).lower())
+
+
+# ----------------------------- Report -----------------------------
+def percentiles(values) -> dict:
+    values = sorted(values)
+    if not values:
+        return {}
+    pick = lambda q: round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 2)  # noqa: E731
+    return {'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99), 'max': round(values[-1] * 1000, 2)}
+
+
+def recall(task, truth, found):
+    """(hits, expected) per kind of planted value."""
+    if task == 'pii':
+        expected = {kind: truth['pii'][kind] for kind in corpus_module.PII_KINDS}
+    else:
+        expected = {'dates': truth['dates'], 'money': truth['money']}
+    scores = {}
+    for kind, values in expected.items():
+        reported = set(found.get(kind, ()))
+        normalize = (lambda v: v) if kind == 'dates' else _normalize
+        scores[kind] = (sum(normalize(v) in reported for v in values), len(values))
+    return scores
+
+
+def summarize(task, records, files, peak_rss):
+    formats = defaultdict(lambda: {'records': [], 'recall': defaultdict(lambda: [0, 0])})
+    stages = defaultdict(float)
+    for record in records:
+        info = files[os.path.basename(record['path'])]
+        group = formats[info['format']]
+        group['records'].append(record)
+        if 'error' in record:
+            continue
+        for name, seconds in record['stages'].items():
+            stages[name] += seconds
+        for kind, (hits, expected) in recall(task, info, record['result']).items():
+            group['recall'][kind][0] += hits
+            group['recall'][kind][1] += expected
+
+    report = {}
+    for fmt, group in sorted(formats.items()):
+        ok = [r for r in group['records'] if 'error' not in r]
+        seconds = sum(r['seconds'] for r in ok)
+        mb = sum(files[os.path.basename(r['path'])]['bytes'] for r in ok) / 1024 / 1024
+        hits = sum(h for h, _ in group['recall'].values())
+        expected = sum(e for _, e in group['recall'].values())
+        report[fmt] = {
+            'files': len(ok),
+            'errors': len(group['records']) - len(ok),
+            'mb': round(mb, 3),
+            'seconds': round(seconds, 4),
+            'files_per_second': round(len(ok) / seconds, 2) if seconds else None,
+            'mb_per_second': round(mb / seconds, 3) if seconds else None,
+            'latency_ms': percentiles([r['seconds'] for r in ok]),
+            'recall': round(hits / expected, 4) if expected else None,
+            'recall_by_kind': {kind: round(h / e, 4) if e else None for kind, (h, e) in group['recall'].items()},
+        }
+    return {'formats': report, 'stages': {name: round(s, 4) for name, s in
+                                          sorted(stages.items(), key=lambda item: item[1], reverse=True)},
+            'peak_rss_mb': peak_rss}
+
+
+def print_task(task, summary):
+    print(f"{task}  (peak RSS {summary['peak_rss_mb']} MB)")
+    print(f"  {'format':6} {'files':>5} {'files/s':>9} {'MB/s':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+          f"{'recall':>7}")
+    for fmt, row in summary['formats'].items():
+        latency = row['latency_ms']
+        errors = f"  ({row['errors']} failed)" if row['errors'] else ""
+        print(f"  {fmt:6} {row['files']:>5} {row['files_per_second'] or 0:>9.1f} {row['mb_per_second'] or 0:>8.2f} "
+              f"{latency.get('p50', 0):>9.1f} {latency.get('p90', 0):>9.1f} {latency.get('p99', 0):>9.1f} "
+              f"{_pct(row['recall']):>7}{errors}")
+        missed = [f"{kind} {_pct(value)}" for kind, value in row['recall_by_kind'].items()
+                  if value is not None and value < 1]
+        if missed:
+            print(f"  {'':6} recall below 100%: {', '.join(missed)}")
+    top = list(summary['stages'].items())[:6]
+    if top:
+        print("  time by stage: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in top))
+
+
+def _pct(value):
+    return "-" if value is None else f"{value * 100:.1f}%"
+
+
+def compare(baseline, current):
+    """Print the change of the headline numbers against a saved run."""
+    print(f"\nchange against {baseline['commit']}{' (dirty)' if baseline['dirty'] else ''}:")
+    for task, summary in current['tasks'].items():
+        old_task = baseline['tasks'].get(task)
+        if not old_task:
+            continue
+        for fmt, row in summary['formats'].items():
+            old = old_task['formats'].get(fmt)
+            if not old:
+                continue
+            cells = [_change("files/s", old['files_per_second'], row['files_per_second']),
+                     _change("p90 ms", old['latency_ms'].get('p90'), row['latency_ms'].get('p90')),
+                     f"recall {_pct(old['recall'])} -> {_pct(row['recall'])}"]
+            print(f"  {task:5} {fmt:6} " + "   ".join(cells))
+        print(f"  {task:5} {'':6} " + _change("peak RSS MB", old_task['peak_rss_mb'], summary['peak_rss_mb']))
+
+
+def _change(label, old, new):
+    if not old or new is None:
+        return f"{label} {old} -> {new}"
+    return f"{label} {old:g} -> {new:g} ({(new - old) / old * 100:+.1f}%)"
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", nargs="?", help="corpus folder from corpus.py (default: generate a small one)")
+    parser.add_argument("--tasks", nargs="+", choices=TASKS, default=list(TASKS))
+    parser.add_argument("--formats", nargs="+", choices=corpus_module.FORMATS, default=None,
+                        help="only benchmark these formats of the corpus")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per file; the fastest is kept")
+    parser.add_argument("--ocr-tier", default="standard", help="OCR tier for the pii task (default: standard)")
+    parser.add_argument("--save", metavar="JSON", help="write the results here, to compare against later")
+    parser.add_argument("--compare", metavar="JSON", help="results saved by an earlier run to compare against")
+    parser.add_argument("--documents", type=int, default=10, help="when generating: number of leases")
+    parser.add_argument("--pages", type=int, default=3, help="when generating: approximate pages per lease")
+    parser.add_argument("--density", type=float, default=0.2, help="when generating: share of sentences with PII")
+    parser.add_argument("--seed", type=int, default=1, help="when generating: random seed")
+    args = parser.parse_args()
+
+    directory = args.corpus or tempfile.mkdtemp(prefix="corpus-")
+    if not os.path.exists(os.path.join(directory, corpus_module.CORPUS_JSON)):
+        corpus_module.generate(directory, documents=args.documents, pages=args.pages, density=args.density,
+                               formats=args.formats or corpus_module.FORMATS, seed=args.seed)
+    corpus = corpus_module.load(directory)
+    files = corpus['files']
+    paths = [os.path.join(directory, name) for name, info in sorted(files.items())
+             if args.formats is None or info['format'] in args.formats]
+    if not paths:
+        sys.exit("No corpus files match --formats")
+    warm_up = list({files[os.path.basename(p)]['format']: p for p in reversed(paths)}.values())
+
+    commit, dirty = git_revision()
+    config = corpus['config']
+    print(f"commit {commit}{' (dirty)' if dirty else ''}, {len(paths)} files from {directory} "
+          f"({config['documents']} documents x {config['pages']} pages, density {config['density']}, "
+          f"seed {config['seed']})\n")
+    results = {'commit': commit, 'dirty': dirty, 'python': platform.python_version(), 'platform': platform.platform(),
+               'corpus': config, 'repeat': args.repeat, 'tasks': {}}
+    context = multiprocessing.get_context("spawn")
+    for task in args.tasks:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            records, peak_rss = pool.submit(run_task, task, paths, warm_up, args.repeat, args.ocr_tier).result()
+        results['tasks'][task] = summarize(task, records, files, peak_rss)
+        print_task(task, results['tasks'][task])
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+        print(f"\n[INFO] Results saved to {args.save}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
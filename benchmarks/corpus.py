@@ -0,0 +1,336 @@
+"""Synthetic South African lease corpus with known PII, dates and amounts.
+
+Every document is a lease in English and Afrikaans clauses with SA ID numbers,
+passport, cellphone and landline numbers, email addresses, Rand amounts and dates
+mixed in. The same documents are written in each requested format, and corpus.json
+records the settings and, per file, exactly what was planted, so the benchmark
+harness can measure recall as well as speed. A given seed always produces the same
+corpus.
+
+    python benchmarks/corpus.py /tmp/corpus                                # 20 documents, all formats
+    python benchmarks/corpus.py /tmp/corpus --documents 200 --pages 10 --density 0.3
+    python benchmarks/corpus.py /tmp/corpus --formats txt docx pdf         # no scans (no Pillow needed)
+
+Text PDFs and .docx files are written directly, without a PDF or Word library.
+Scanned PDFs are rendered page images and need Pillow.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import textwrap
+import zipfile
+from xml.sax.saxutils import escape
+
+FORMATS = ('txt', 'docx', 'pdf', 'scan')
+EXTENSIONS = {'txt': '.txt', 'docx': '.docx', 'pdf': '.pdf', 'scan': '.pdf'}
+CORPUS_JSON = 'corpus.json'
+LINES_PER_PAGE = 40
+LINE_CHARS = 90
+
+FIRST_NAMES = ["Jan", "Pieter", "Thandiwe", "Sipho", "Annelie", "Lerato", "Johan", "Naledi", "Riaan", "Zanele"]
+SURNAMES = ["Smit", "van der Merwe", "Nkosi", "Dlamini", "Botha", "Mokoena", "Pretorius", "Khumalo", "Naidoo"]
+COMPANIES = ["Acme Properties (Pty) Ltd", "Karoo Estates CC", "Tafelberg Beleggings (Edms) Bpk",
+             "Highveld Rentals (Pty) Ltd"]
+DOMAINS = ["example.co.za", "mail.example.com", "webmail.co.za"]
+MONTHS_EN = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+             "November", "December"]
+MONTHS_AF = ["Januarie", "Februarie", "Maart", "April", "Mei", "Junie", "Julie", "Augustus", "September",
+             "Oktober", "November", "Desember"]
+DATE_FORMATS = [
+    lambda d, m, y: f"{d:02d}/{m:02d}/{y}",
+    lambda d, m, y: f"{y}-{m:02d}-{d:02d}",
+    lambda d, m, y: f"{d} {MONTHS_EN[m - 1]} {y}",
+    lambda d, m, y: f"{MONTHS_EN[m - 1]} {d}, {y}",
+    lambda d, m, y: f"{d} {MONTHS_AF[m - 1]} {y}",
+]
+CLAUSES_EN = [
+    "The Tenant shall pay the monthly rental in advance on or before the first day of each month.",
+    "The security deposit shall be held in an interest bearing account as required by the Rental Housing Act.",
+    "Either party may cancel this agreement on one calendar month's written notice.",
+    "The Landlord shall attend to maintenance and repair of the roof, gutters and exterior walls.",
+    "Electricity, water and municipal rates are payable by the Tenant in addition to the rental.",
+    "This agreement is subject to the Consumer Protection Act and South African law.",
+    "The Tenant shall not sublet the premises or any part thereof without prior written consent.",
+    "Termination of this lease does not release either party from obligations that arose before it.",
+]
+CLAUSES_AF = [
+    "Die Huurder sal die huur maandeliks vooruit betaal voor of op die eerste dag van elke maand.",
+    "Die borg word in 'n rentedraende rekening gehou tot die einde van die huurtermyn.",
+    "Enige party kan hierdie ooreenkoms met een kalendermaand skriftelike kennisgewing kanselleer.",
+    "Die Verhuurder is verantwoordelik vir die onderhoud van die dak en buitemure.",
+    "Water en elektrisiteit is deur die Huurder betaalbaar bo en behalwe die huur.",
+]
+# What each kind of planted value is checked against; see bench_suite.py
+PII_KINDS = {'id': "ID Number", 'passport': "Passport Number", 'cellphone': "Cellphone Number",
+             'landline': "Landline Number", 'email': "Email"}
+
+
+# ----------------------------- Planted values -----------------------------
+def _luhn_digit(digits):
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        d = int(d)
+        if i % 2 == 0:  # every second digit from the right, starting with the last payload digit
+            d = d * 2 - 9 if d > 4 else d * 2
+        total += d
+    return str((10 - total % 10) % 10)
+
+
+def sa_id_number(rng):
+    """A valid 13-digit SA ID number: birth date, sequence, citizenship, 8 and a Luhn check digit."""
+    year, month, day = rng.randint(1940, 2005), rng.randint(1, 12), rng.randint(1, 28)
+    payload = f"{year % 100:02d}{month:02d}{day:02d}{rng.randint(0, 9999):04d}{rng.choice('01')}8"
+    return payload + _luhn_digit(payload)
+
+
+def passport_number(rng):
+    return rng.choice("ADMT") + "".join(str(rng.randint(0, 9)) for _ in range(8))
+
+
+def cellphone_number(rng):
+    return f"0{rng.choice('678')}{rng.randint(0, 9)} {rng.randint(100, 999)} {rng.randint(1000, 9999)}"
+
+
+def landline_number(rng):
+    area = rng.choice(['11', '12', '21', '31', '41', '51'])
+    prefix = rng.choice(['0', '+27 '])  # local and international style
+    return f"{prefix}{area} {rng.randint(100, 999)} {rng.randint(1000, 9999)}"
+
+
+def email_address(rng):
+    name = f"{rng.choice(FIRST_NAMES)}.{rng.choice(SURNAMES).replace(' ', '')}".lower()
+    return f"{name}{rng.randint(1, 99)}@{rng.choice(DOMAINS)}"
+
+
+def rand_amount(rng):
+    return f"R{rng.randint(1, 250) * 500:,}.00"
+
+
+def lease_date(rng):
+    """Returns (text as written, ISO date)."""
+    d, m, y = rng.randint(1, 28), rng.randint(1, 12), rng.randint(2015, 2030)
+    return rng.choice(DATE_FORMATS)(d, m, y), f"{y}-{m:02d}-{d:02d}"
+
+
+PII_MAKERS = {'id': sa_id_number, 'passport': passport_number, 'cellphone': cellphone_number,
+              'landline': landline_number, 'email': email_address}
+SENTENCES = {
+    'id': "The {party} confirms that their identity number is {value}.",
+    'passport': "Foreign national passport number {value} was presented by the {party}.",
+    'cellphone': "The {party} may be contacted on {value} during office hours.",
+    'landline': "Notices may also be given by telephone on {value}.",
+    'email': "Correspondence to the {party} shall be sent to {value}.",
+    'money': "The {party} shall pay an amount of {value} on signature.",
+    'date': "This lease commences on {value}.",
+}
+
+
+# ----------------------------- Documents -----------------------------
+class Document:
+    """One synthetic lease: its paragraphs and the values planted in them."""
+
+    def __init__(self, paragraphs, truth):
+        self.paragraphs = paragraphs
+        self.truth = truth
+
+    def lines(self):
+        """The text wrapped to page width, never breaking inside a planted value."""
+        lines = []
+        for paragraph in self.paragraphs:
+            # Spaces inside planted values are protected from wrapping
+            lines.extend(line.replace('\x00', ' ') for line in textwrap.wrap(
+                paragraph, LINE_CHARS, break_long_words=False, break_on_hyphens=False))
+            lines.append('')
+        return lines
+
+    def pages(self):
+        lines = self.lines()
+        return [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+
+def make_document(rng, pages=3, density=0.2):
+    """A lease of about `pages` pages; `density` is the share of sentences that carry a planted value."""
+    truth = {'pii': {kind: [] for kind in PII_KINDS}, 'dates': [], 'money': []}
+    landlord = rng.choice(COMPANIES)
+    tenant = f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}"
+    paragraphs = ["LEASE AGREEMENT / HUUROOREENKOMS",
+                  f"This agreement is entered into between {landlord} and {tenant} (the Tenant)."]
+    target_lines = pages * LINES_PER_PAGE
+    used = 3
+    while used < target_lines:
+        sentences = []
+        for _ in range(rng.randint(3, 7)):
+            if rng.random() >= density:
+                sentences.append(rng.choice(CLAUSES_AF if rng.random() < 0.3 else CLAUSES_EN))
+                continue
+            kind = rng.choice(list(PII_MAKERS) + ['money', 'date'])
+            if kind == 'date':
+                value, iso = lease_date(rng)
+                truth['dates'].append(iso)
+            elif kind == 'money':
+                value = rand_amount(rng)
+                truth['money'].append(value)
+            else:
+                value = PII_MAKERS[kind](rng)
+                truth['pii'][kind].append(value)
+            sentences.append(SENTENCES[kind].format(party=rng.choice(['Tenant', 'Landlord']),
+                                                    value=value.replace(' ', '\x00')))
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        used += len(paragraph) // LINE_CHARS + 2
+    return Document(paragraphs, truth)
+
+
+def _text(document):
+    return "\n\n".join(p.replace('\x00', ' ') for p in document.paragraphs) + "\n"
+
+
+def write_txt(path, document):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(_text(document))
+
+
+_CONTENT_TYPES = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                  '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                  '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                  '<Default Extension="xml" ContentType="application/xml"/>'
+                  '<Override PartName="/word/document.xml" ContentType="application/'
+                  'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>')
+_PACKAGE_RELS = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                 '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                 '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                 'relationships/officeDocument" Target="word/document.xml"/></Relationships>')
+
+
+def write_docx(path, document):
+    """A minimal WordprocessingML package: one paragraph per paragraph of the lease."""
+    body = "".join(f'<w:p><w:r><w:t xml:space="preserve">{escape(p.replace(chr(0), " "))}</w:t></w:r></w:p>'
+                   for p in document.paragraphs)
+    xml = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+           '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+           f'<w:body>{body}</w:body></w:document>')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _PACKAGE_RELS)
+        archive.writestr('word/document.xml', xml)
+
+
+def _pdf_string(text):
+    text = text.encode('latin-1', 'replace').decode('latin-1')
+    return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+def write_pdf(path, document):
+    """A PDF with a real text layer, one A4 page per LINES_PER_PAGE lines, in Helvetica."""
+    pages = document.pages()
+    font_id = 3
+    objects = {1: "<< /Type /Catalog /Pages 2 0 R >>",
+               font_id: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"}
+    kids = []
+    for n, lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * n, 5 + 2 * n
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 790 Td"]
+        ops.extend(f"{_pdf_string(line)} Tj T*" for line in lines)
+        ops.append("ET")
+        stream = "\n".join(ops).encode('latin-1')
+        objects[content_id] = (f"<< /Length {len(stream)} >>\nstream\n".encode('latin-1') + stream
+                               + b"\nendstream")
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>")
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = {}
+        for obj_id in sorted(objects):
+            offsets[obj_id] = f.tell()
+            body = objects[obj_id]
+            f.write(f"{obj_id} 0 obj\n".encode('latin-1'))
+            f.write(body if isinstance(body, bytes) else body.encode('latin-1'))
+            f.write(b"\nendobj\n")
+        xref = f.tell()
+        count = max(objects) + 1
+        f.write(f"xref\n0 {count}\n0000000000 65535 f \n".encode('latin-1'))
+        for obj_id in range(1, count):
+            f.write(f"{offsets[obj_id]:010d} 00000 n \n".encode('latin-1'))
+        f.write(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1'))
+
+
+def write_scan(path, document, seed=0):
+    """A PDF of page images, as a scanner would produce: no text layer, slight blur and speckle."""
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 26)
+    except OSError:
+        font = ImageFont.load_default()
+    rng = random.Random(seed)
+    images = []
+    for lines in document.pages():
+        image = Image.new("L", (1654, 2339), 255)  # A4 at 200 DPI
+        draw = ImageDraw.Draw(image)
+        for n, line in enumerate(lines):
+            draw.text((120, 120 + n * 52), line, fill=rng.randint(0, 60), font=font)
+        image = image.filter(ImageFilter.GaussianBlur(0.6))
+        for _ in range(3000):
+            image.putpixel((rng.randrange(1654), rng.randrange(2339)), rng.randint(120, 255))
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=200)
+
+
+WRITERS = {'txt': write_txt, 'docx': write_docx, 'pdf': write_pdf, 'scan': write_scan}
+
+
+def generate(directory, documents=20, pages=3, density=0.2, formats=FORMATS, seed=1):
+    """Write the corpus to `directory` and return the parsed corpus.json.
+
+    Document i has the same content in every format; files are named
+    lease_0001.txt, lease_0001.docx, lease_0001.pdf and lease_0001_scan.pdf.
+    """
+    os.makedirs(directory, exist_ok=True)
+    config = {'documents': documents, 'pages': pages, 'density': density, 'formats': list(formats), 'seed': seed}
+    files = {}
+    for i in range(documents):
+        document = make_document(random.Random(f"{seed}-{i}"), pages=pages, density=density)
+        for fmt in formats:
+            name = f"lease_{i + 1:04d}{'_scan' if fmt == 'scan' else ''}{EXTENSIONS[fmt]}"
+            path = os.path.join(directory, name)
+            if fmt == 'scan':
+                write_scan(path, document, seed=i)
+            else:
+                WRITERS[fmt](path, document)
+            files[name] = {'format': fmt, 'bytes': os.path.getsize(path), **document.truth}
+    corpus = {'config': config, 'files': files}
+    with open(os.path.join(directory, CORPUS_JSON), 'w', encoding='utf-8') as f:
+        json.dump(corpus, f, indent=1)
+    return corpus
+
+
+def load(directory):
+    with open(os.path.join(directory, CORPUS_JSON), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="folder to write the corpus to")
+    parser.add_argument("--documents", type=int, default=20, help="number of leases (default: 20)")
+    parser.add_argument("--pages", type=int, default=3, help="approximate pages per lease (default: 3)")
+    parser.add_argument("--density", type=float, default=0.2,
+                        help="share of sentences carrying PII, a date or an amount (default: 0.2)")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    corpus = generate(args.directory, documents=args.documents, pages=args.pages, density=args.density,
+                      formats=args.formats, seed=args.seed)
+    size = sum(f['bytes'] for f in corpus['files'].values())
+    print(f"[INFO] Wrote {len(corpus['files'])} files ({size / 1024 / 1024:.1f} MB) to {args.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import NamedTuple, Optional
+
+from batch import worker_setting
+
+# ----------------------------- Per-file budgets -----------------------------
+# One huge or hostile file (a 2,000-page scan, a text blob that sends a regex into
+# backtracking) must not stall a whole batch. Budgets cap the work a single file may
+# cause and are enforced inside the worker processing it:
+#   - max_ocr_pages and max_scan_chars cap how much of a file is OCRed and scanned. The
+#     rest is left out and the result is marked 'partial'.
+#   - file_seconds and stage_seconds are wall-clock limits. A file that runs over is
+#     abandoned and its result is marked 'deferred', to be retried on its own later.
+# Time limits interrupt the work with SIGALRM where that is available (Unix, on the
+# main thread of the worker); elsewhere they are checked between pages and chunks.
+
+
+class Budgets(NamedTuple):
+    max_ocr_pages: Optional[int]  # pages OCRed per PDF
+    max_scan_chars: Optional[int]  # characters of text scanned per file
+    file_seconds: Optional[float]  # wall-clock time per file
+    stage_seconds: dict  # wall-clock time per stage, by stage name (see metrics.stage)
+
+
+DEFAULT_BUDGETS = Budgets(
+    max_ocr_pages=200,
+    max_scan_chars=256 * 1024 * 1024,
+    file_seconds=900.0,
+    stage_seconds={'text_layer': 300.0, 'ocr': 600.0, 'regex_scan': 120.0, 'stream_scan': 600.0,
+                   'find_dates': 120.0, 'clause_search': 60.0},
+)
+BUDGETS = DEFAULT_BUDGETS
+
+
+def get_budgets() -> Budgets:
+    return BUDGETS
+
+
+def set_budgets(**changes):
+    """Change budgets for this process and the pools it opens afterwards; None switches a limit off."""
+    global BUDGETS
+    BUDGETS = BUDGETS._replace(**changes)
+
+
+def _use_budgets(budgets):
+    global BUDGETS
+    BUDGETS = budgets
+
+
+worker_setting(get_budgets, _use_budgets)
+
+
+class BudgetExceeded(BaseException):
+    """A file ran out of time.
+
+    Derived from BaseException so the broad `except Exception` around extraction code
+    does not swallow it; process_single_file() and process_file() catch it.
+    """
+
+
+_deadlines = []  # (monotonic deadline, message) of the active limits, innermost last
+_in_file = False
+
+
+def _alarm_usable() -> bool:
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+def _arm():
+    if _deadlines:
+        remaining = min(deadline for deadline, _ in _deadlines) - time.monotonic()
+        signal.setitimer(signal.ITIMER_REAL, max(remaining, 0.001))
+    else:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _on_alarm(signum, frame):
+    check()
+    _arm()  # an outer limit is still running
+
+
+def check():
+    """Raise BudgetExceeded when a time limit of the current file has passed.
+
+    Cheap; long loops (pages, chunks) call it so limits hold where SIGALRM is not available.
+    """
+    if _deadlines:
+        now = time.monotonic()
+        for deadline, message in _deadlines:
+            if now >= deadline:
+                raise BudgetExceeded(message)
+
+
+@contextmanager
+def _limit(seconds, message):
+    entry = (time.monotonic() + seconds, message)
+    alarm = _alarm_usable()
+    _deadlines.append(entry)
+    if alarm:
+        _arm()
+    try:
+        yield
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)  # no alarm between here and the removal
+        _deadlines.remove(entry)
+        if alarm:
+            _arm()
+
+
+@contextmanager
+def file_budget():
+    """Run the processing of one file under BUDGETS.file_seconds; stage limits apply inside."""
+    global _in_file
+    seconds = BUDGETS.file_seconds
+    previous = signal.signal(signal.SIGALRM, _on_alarm) if _alarm_usable() else None
+    outer, _in_file = _in_file, True
+    if not outer:
+        _deadlines.clear()  # left behind if an alarm already due raised before its removal
+    try:
+        if seconds is None:
+            yield
+        else:
+            with _limit(seconds, f"over the {seconds:g}s time budget per file"):
+                yield
+    finally:
+        _in_file = outer
+        if previous is not None:
+            signal.signal(signal.SIGALRM, previous)
+
+
+@contextmanager
+def stage_budget(name):
+    """Limit the block to the time budget of stage `name`, when inside file_budget()."""
+    seconds = BUDGETS.stage_seconds.get(name)
+    if not _in_file or seconds is None:
+        yield
+        return
+    with _limit(seconds, f"stage '{name}' over its {seconds:g}s time budget"):
+        yield
+
+
+# ----------------------------- Command line -----------------------------
+def add_budget_arguments(parser):
+    """Add --max-ocr-pages, --max-scan-chars, --file-timeout and --stage-timeout to `parser`."""
+    group = parser.add_argument_group("budgets", "limits on the work one file may cause (0 switches a limit off)")
+    group.add_argument("--max-ocr-pages", type=int, default=BUDGETS.max_ocr_pages,
+                       help=f"OCR at most this many pages per PDF (default: {BUDGETS.max_ocr_pages})")
+    group.add_argument("--max-scan-chars", type=int, default=BUDGETS.max_scan_chars,
+                       help=f"scan at most this many characters per file (default: {BUDGETS.max_scan_chars})")
+    group.add_argument("--file-timeout", type=float, default=BUDGETS.file_seconds,
+                       help=f"seconds per file before it is deferred (default: {BUDGETS.file_seconds:g})")
+    group.add_argument("--stage-timeout", action="append", default=[], metavar="STAGE=SECONDS",
+                       help="seconds for one stage of a file, e.g. ocr=300 (repeatable; stages: "
+                            + ", ".join(BUDGETS.stage_seconds) + ")")
+
+
+def apply_budget_arguments(args):
+    """Apply the options added by add_budget_arguments()."""
+    stage_seconds = dict(BUDGETS.stage_seconds)
+    for item in args.stage_timeout:
+        name, sep, seconds = item.partition('=')
+        if not sep:
+            raise SystemExit(f"--stage-timeout expects STAGE=SECONDS, got {item!r}")
+        stage_seconds[name] = float(seconds) or None
+    set_budgets(max_ocr_pages=args.max_ocr_pages or None, max_scan_chars=args.max_scan_chars or None,
+                file_seconds=args.file_timeout or None, stage_seconds=stage_seconds)
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from batch import worker_setting
+from metrics import stage
+
+# ----------------------------- Extraction cache -----------------------------
+# Extracted text (per page where the format has pages) is stored on disk keyed by the
+# file's content hash plus the extractor version and OCR settings, so rerunning an
+# analysis over an unchanged folder skips extraction and OCR entirely. The cache is a
+# single SQLite file shared by all worker processes and evicts least recently used
+# entries once it grows past its size limit.
+
+CACHE_DIR = os.environ.get("EXTRACTION_CACHE_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "legal-automation"))
+CACHE_MAX_BYTES = int(os.environ.get("EXTRACTION_CACHE_MAX_MB", "2048")) * 1024 * 1024
+CACHE_ENABLED = os.environ.get("EXTRACTION_CACHE", "on").lower() not in ("0", "off", "false", "no")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def file_digest(path, chunk_size=1024 * 1024) -> str:
+    """SHA-256 of the file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.path = os.path.join(directory, "extraction_cache.sqlite3")
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # A connection must not cross a fork, so every worker process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @staticmethod
+    def make_key(digest, extractor, version, settings=None) -> str:
+        settings = json.dumps(settings or {}, sort_keys=True)
+        return hashlib.sha256(f"{digest}|{extractor}|{version}|{settings}".encode()).hexdigest()
+
+    def _count(self, conn, name):
+        conn.execute("INSERT INTO counters (name, value) VALUES (?, 1) "
+                     "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def get(self, key):
+        """Return the cached value for `key`, or None on a miss."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count(conn, "misses")
+                return None
+            conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._count(conn, "hits")
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, value):
+        """Store a JSON-serializable `value`, evicting least recently used entries if needed."""
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                         (key, blob, len(blob), time.time()))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        conn.execute("INSERT INTO counters (name, value) VALUES ('evictions', ?) "
+                     "ON CONFLICT(name) DO UPDATE SET value = value + ?", (evicted, evicted))
+
+    def stats(self) -> dict:
+        """Hit, miss and eviction counts plus the current number and size of entries."""
+        with self._lock:
+            conn = self._connect()
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            'hits': counters.get('hits', 0),
+            'misses': counters.get('misses', 0),
+            'evictions': counters.get('evictions', 0),
+            'entries': entries,
+            'bytes': size,
+        }
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM counters")
+
+
+_cache = None
+
+
+def get_cache():
+    """Return the process-wide cache, or None when caching is switched off."""
+    global _cache
+    if _cache is None and CACHE_ENABLED:
+        _cache = ExtractionCache()
+    return _cache
+
+
+def set_cache(cache):
+    """Replace the process-wide cache; pass None to turn caching off."""
+    global _cache, CACHE_ENABLED
+    _cache = cache
+    CACHE_ENABLED = cache is not None
+
+
+def _cache_settings():
+    """(directory, max_bytes) of the process-wide cache, or None when caching is off."""
+    if not CACHE_ENABLED:
+        return None
+    cache = _cache or ExtractionCache()
+    return cache.directory, cache.max_bytes
+
+
+def _use_cache_settings(settings):
+    set_cache(ExtractionCache(*settings) if settings else None)
+
+
+worker_setting(_cache_settings, _use_cache_settings)
+
+
+def cached_extract(path, extractor, version, extract, settings=None):
+    """Return extract() for `path`, served from the cache when the file's content is unchanged.
+
+    `extract` must return a JSON-serializable value. Values with an 'error' key set are
+    returned but not stored, so failed reads are retried on the next run.
+    """
+    cache = get_cache()
+    if cache is None:
+        return extract()
+    try:
+        with stage('cache_lookup'):
+            key = cache.make_key(file_digest(path), extractor, version, settings)
+            value = cache.get(key)
+    except (OSError, sqlite3.Error) as e:
+        print(f"[ERROR] Extraction cache unavailable for: {path}\n{e}")
+        return extract()
+    if value is not None:
+        return value
+
+    value = extract()
+    if not (isinstance(value, dict) and value.get('error')):
+        try:
+            with stage('cache_store'):
+                cache.put(key, value)
+        except sqlite3.Error as e:
+            print(f"[ERROR] Could not cache extraction of: {path}\n{e}")
+    return value
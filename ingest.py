@@ -0,0 +1,373 @@
+import argparse
+import json
+import os
+import sys
+from functools import partial
+from typing import Callable, NamedTuple
+
+# --- External libraries ---
+import pdfplumber
+
+from batch import Reorder, run_batch, worker_setting
+from budgets import (BudgetExceeded, add_budget_arguments, apply_budget_arguments, file_budget, get_budgets,
+                     stage_budget)
+from cache import cached_extract, set_cache
+from metrics import stage
+from ocr import OCR_TIERS, get_tier, hybrid_pdf_pages, ocr_image, ocr_settings
+from ooxml import docx_text, pptx_text
+from results_index import ResultsIndex
+from sinks import CsvSink, JsonlSink
+
+# ----------------------------- Document ingestion -----------------------------
+# One extractor per format turns a file into a document: its text and, for PDFs, the
+# text and source ('text', 'ocr' or 'skipped') of every page. Documents are kept in the
+# shared extraction cache, so a file is parsed and OCRed once however many analyzers
+# and tools read it. Analyzers (lease fields, health score, PII) then run over the one
+# document in a single pass, and sweep() writes every analyzer's output for a file set.
+
+INGEST_VERSION = 1  # bump when extraction changes so cached documents are not reused
+# Both tools' languages, so one OCR pass serves every analyzer
+OCR_LANGUAGES = ('en', 'af')
+OCR_GPU = True  # EasyOCR falls back to CPU when no GPU is available
+OCR_TIER = 'balanced'  # the lease analyzer needs scanned clauses read accurately
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.tiff']
+
+
+def _read_txt(path, languages, gpu, tier):
+    max_chars = get_budgets().max_scan_chars
+    with stage('read'), open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        # One character over the budget, so analyzers can tell the text was cut
+        return {'text': f.read() if max_chars is None else f.read(max_chars + 1), 'pages': []}
+
+
+def _read_json(path, languages, gpu, tier):
+    with stage('read'), open(path, 'r', encoding='utf-8') as f:
+        return {'text': json.dumps(json.load(f), indent=2), 'pages': []}
+
+
+def _read_pdf(path, languages, gpu, tier):
+    try:
+        with stage('open'):
+            pdf = pdfplumber.open(path)
+        with pdf, stage('text_layer'), stage_budget('text_layer'):
+            text_pages = [page.extract_text() or '' for page in pdf.pages]
+    except Exception:
+        text_pages = None  # no usable text layer: every page is OCRed
+    pages = hybrid_pdf_pages(path, text_pages, languages, gpu=gpu, tier=tier, max_pages=get_budgets().max_ocr_pages)
+    return {'text': "\n".join(page['text'] for page in pages if page['text']).strip(), 'pages': pages}
+
+
+def _read_docx(path, languages, gpu, tier):
+    with stage('text_layer'), stage_budget('text_layer'):
+        return {'text': docx_text(path), 'pages': []}
+
+
+def _read_pptx(path, languages, gpu, tier):
+    with stage('text_layer'), stage_budget('text_layer'):
+        return {'text': pptx_text(path), 'pages': []}
+
+
+def _read_image(path, languages, gpu, tier):
+    return {'text': ocr_image(path, languages, gpu=gpu, tier=tier) or "", 'pages': []}
+
+
+EXTRACTORS = {'.txt': _read_txt, '.json': _read_json, '.pdf': _read_pdf, '.docx': _read_docx, '.pptx': _read_pptx}
+EXTRACTORS.update((ext, _read_image) for ext in IMAGE_EXTENSIONS)
+# Plain text is just read; everything else costs more than hashing the file
+CACHED_EXTENSIONS = [ext for ext in EXTRACTORS if ext != '.txt']
+OCR_EXTENSIONS = ['.pdf'] + IMAGE_EXTENSIONS
+
+
+def extract_document(path, languages=None, gpu=None, tier=None) -> dict:
+    """Extract `path` with the extractor for its format.
+
+    Returns {'text': str, 'pages': list, 'page_sources': list, 'error': str or None};
+    'pages' holds {'page', 'source', 'text'} per page of a PDF and is empty otherwise.
+    OCR options left as None follow OCR_LANGUAGES, OCR_GPU and OCR_TIER (see
+    set_ocr_tier()). Served from the extraction cache when the file's content has not
+    changed.
+    """
+    languages = OCR_LANGUAGES if languages is None else languages
+    gpu = OCR_GPU if gpu is None else gpu
+    tier = OCR_TIER if tier is None else tier
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext not in EXTRACTORS:
+        raise ValueError(f"No extractor for {ext or 'files without an extension'}: {path}")
+
+    def extract():
+        try:
+            document = EXTRACTORS[ext](path, languages, gpu, tier)
+            document['error'] = None
+        except Exception as e:
+            print(f"[ERROR] Failed to read file: {path}\n{e}")
+            document = {'text': '', 'pages': [], 'error': str(e)}
+        document['page_sources'] = [page['source'] for page in document['pages']]
+        return document
+
+    if ext not in CACHED_EXTENSIONS:
+        return extract()
+    settings = ocr_settings(languages, tier, get_budgets().max_ocr_pages) if ext in OCR_EXTENSIONS else None
+    return cached_extract(str(path), 'ingest.document', INGEST_VERSION, extract, settings=settings)
+
+
+def set_ocr_tier(tier):
+    """Switch the OCR tier used for scanned PDFs and images (one of ocr.OCR_TIERS)."""
+    global OCR_TIER
+    get_tier(tier)
+    OCR_TIER = tier
+
+
+worker_setting(lambda: OCR_TIER, set_ocr_tier)
+
+
+# ----------------------------- Analyzers -----------------------------
+# An analyzer turns a file's document into one output. run(path, document, found) gets
+# a function returning the (cached) document, so analyzers that read the file their own
+# way never trigger an extraction, and `found` with the outputs of the analyzers run
+# before it on the same file. It returns None when it has nothing to report for the
+# file. Register your own with register_analyzer().
+
+class Analyzer(NamedTuple):
+    extensions: tuple  # formats it applies to
+    run: Callable
+    requires: tuple = ()  # analyzers whose output it reads; they run first
+
+
+ANALYZERS = {}
+
+
+def register_analyzer(name, extensions, run, requires=()):
+    ANALYZERS[name] = Analyzer(tuple(extensions), run, tuple(requires))
+
+
+def _run_lease(path, document, found):
+    import lease_analytics
+
+    doc = document()
+    if doc['error']:
+        return None  # unreadable; the pii analyzer reports the error
+    return lease_analytics.lease_fields(doc['text'], doc['page_sources'])
+
+
+def _run_health(path, document, found):
+    import lease_analytics
+
+    return {'health_score': lease_analytics.compute_health_score(found['lease'])}
+
+
+def _run_pii(path, document, found):
+    import pii_scan
+
+    if pii_scan.is_streamed(path):
+        return pii_scan.process_single_file(path)  # spreadsheets and huge text files are scanned from disk
+    doc = document()
+    return pii_scan.scan_document(path, doc['text'], doc['page_sources'], doc['error'])
+
+
+register_analyzer('lease', ['.pdf', '.docx', '.txt'], _run_lease)
+register_analyzer('health', ['.pdf', '.docx', '.txt'], _run_health, requires=['lease'])
+register_analyzer('pii', ['.txt', '.json', '.pdf', '.docx', '.xlsx', '.xls', '.pptx'] + IMAGE_EXTENSIONS, _run_pii)
+DEFAULT_ANALYZERS = ('lease', 'health', 'pii')
+
+
+def resolve_analyzers(names) -> list:
+    """`names` plus the analyzers they require, each after its requirements."""
+    ordered = []
+
+    def add(name):
+        if name not in ANALYZERS:
+            raise ValueError(f"Unknown analyzer {name!r}; choose from {', '.join(ANALYZERS)}")
+        for required in ANALYZERS[name].requires:
+            add(required)
+        if name not in ordered:
+            ordered.append(name)
+
+    for name in names:
+        add(name)
+    return ordered
+
+
+def analyze_file(path, analyzers=DEFAULT_ANALYZERS, keep_text=False) -> dict:
+    """Run `analyzers` over one file, extracting it at most once.
+
+    Returns {'file_name', 'path', 'status', 'over_budget', 'outputs': {analyzer: output}},
+    covering the analyzers that apply to the file's format. 'status' is 'deferred' when
+    the file ran out of time (no outputs), 'partial' when an analyzer reported a budget
+    cap, and 'ok' otherwise. With `keep_text`, 'text' holds the document's text when an
+    analyzer extracted it.
+    """
+    path = str(path)
+    ext = os.path.splitext(path)[1].lower()
+    record = {'file_name': os.path.basename(path), 'path': path, 'status': 'ok', 'over_budget': [], 'outputs': {}}
+    document = None
+
+    def load():
+        nonlocal document
+        if document is None:
+            document = extract_document(path)
+        return document
+
+    try:
+        with file_budget():
+            for name in resolve_analyzers(analyzers):
+                analyzer = ANALYZERS[name]
+                if ext in analyzer.extensions and all(r in record['outputs'] for r in analyzer.requires):
+                    with stage(f'analyze_{name}'):
+                        output = analyzer.run(path, load, record['outputs'])
+                    if output is not None:
+                        record['outputs'][name] = output
+    except BudgetExceeded as e:
+        print(f"[INFO] Deferred, {e}: {path}")
+        return dict(record, status='deferred', over_budget=[str(e)], outputs={})
+
+    statuses = set()
+    for output in record['outputs'].values():
+        if isinstance(output, dict):
+            statuses.add(output.get('status'))
+            record['over_budget'].extend(note for note in output.get('over_budget') or ()
+                                         if note not in record['over_budget'])
+    if 'deferred' in statuses:
+        record['status'] = 'deferred'  # an analyzer that reads the file itself ran out of time
+    elif record['over_budget']:
+        record['status'] = 'partial'
+    if keep_text and document is not None:
+        record['text'] = document['text']
+    return record
+
+
+# ----------------------------- Combined sweep -----------------------------
+PII_CSV = 'pii_results.csv'
+
+
+class SweepWriter:
+    """Writes each analyzer's output for a sweep into `out_folder`.
+
+    The pii analyzer fills pii_results.csv as the PII tool does; lease and health fill
+    results.jsonl and summary.csv as lease analytics does; any other analyzer gets
+    <name>.jsonl. Deferred files are listed in every output with status 'deferred'.
+    """
+
+    def __init__(self, out_folder, analyzers):
+        import lease_analytics
+        import pii_scan
+
+        self.lease_analytics, self.pii_scan = lease_analytics, pii_scan
+        os.makedirs(out_folder, exist_ok=True)
+        self.analyzers = analyzers
+        self._pii_file = self._pii_csv = None
+        if 'pii' in analyzers:
+            self._pii_file = open(os.path.join(out_folder, PII_CSV), 'w', newline='', encoding='utf-8')
+            self._pii_csv = pii_scan.open_csv_writer(self._pii_file)
+        self._lease_sinks = []
+        if 'lease' in analyzers:
+            self._lease_sinks = [JsonlSink(os.path.join(out_folder, lease_analytics.RESULTS_JSONL)),
+                                 CsvSink(os.path.join(out_folder, lease_analytics.SUMMARY_CSV),
+                                         lease_analytics.SUMMARY_COLUMNS)]
+        self._other_sinks = {name: JsonlSink(os.path.join(out_folder, f"{name}.jsonl"))
+                             for name in analyzers if name not in ('pii', 'lease', 'health')}
+
+    def write(self, record):
+        outputs = record['outputs']
+        deferred = record['status'] == 'deferred'
+        if self._pii_csv is not None and ('pii' in outputs or deferred):
+            pii = outputs.get('pii') or self.pii_scan.deferred_result(record['path'], record['over_budget'])
+            if pii['status'] != 'skipped':
+                self._pii_csv.writerow(self.pii_scan.result_to_row(pii))
+                self._pii_file.flush()
+        if self._lease_sinks and ('lease' in outputs or deferred):
+            if deferred:
+                lease = self.lease_analytics.deferred_record(record['path'], record['over_budget'])
+            else:
+                lease = dict(outputs['lease'], file_name=record['file_name'], **outputs.get('health', {}))
+            for sink in self._lease_sinks:
+                sink.write(lease)
+        for name, sink in self._other_sinks.items():
+            if name in outputs or deferred:
+                sink.write({'file_name': record['file_name'], 'path': record['path'], 'status': record['status'],
+                            'output': outputs.get(name)})
+
+    def close(self):
+        if self._pii_file is not None:
+            self._pii_file.close()
+        for sink in self._lease_sinks + list(self._other_sinks.values()):
+            sink.close()
+
+
+def sweep(file_paths, out_folder, analyzers=DEFAULT_ANALYZERS, workers=None, on_result=None, cancel=None,
+          index_path=None):
+    """Extract every file once and run `analyzers` over it, writing all outputs to `out_folder`.
+
+    Outputs are written in the order of `file_paths`; `on_result` sees each analyze_file()
+    record as soon as it completes. Setting the `cancel` event stops the sweep early,
+    keeping what was written so far. With `index_path`, the PII and lease outputs and the
+    text of every file also go to that results index (results_index.py). Returns the
+    number of files analyzed.
+    """
+    analyzers = resolve_analyzers(analyzers)
+    extensions = {ext for name in analyzers for ext in ANALYZERS[name].extensions}
+    file_paths = [p for p in file_paths if os.path.splitext(str(p))[1].lower() in extensions]
+    writer = SweepWriter(out_folder, analyzers)
+    results_db = ResultsIndex(index_path) if index_path else None
+    order = Reorder()
+    try:
+        func = partial(analyze_file, analyzers=tuple(analyzers), keep_text=results_db is not None)
+        for index, path, record in run_batch(func, file_paths, workers=workers, gpu=OCR_GPU, cancel=cancel):
+            if record is not None and results_db:
+                outputs = record['outputs']
+                lease = dict(outputs['lease'], **outputs.get('health', {})) if 'lease' in outputs else None
+                results_db.add(path, pii=outputs.get('pii'), lease=lease, text=record.pop('text', None))
+            if record is not None and on_result:
+                on_result(record)
+            for ready in order.push(index, record):
+                if ready is not None:
+                    writer.write(ready)
+    finally:
+        writer.close()
+        if results_db:
+            results_db.close()
+    return len(file_paths)
+
+
+# ----------------------------- Command line -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ingest", description="Extract documents once and run every analyzer.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("sweep", help="analyze files and folders with lease, health and PII analyzers")
+    run.add_argument("paths", nargs="+", metavar="PATH", help="files or folders to analyze")
+    run.add_argument("--out", required=True, help="output folder for pii_results.csv, results.jsonl and summary.csv")
+    run.add_argument("--analyzers", nargs="+", default=list(DEFAULT_ANALYZERS),
+                     help=f"analyzers to run (default: {' '.join(DEFAULT_ANALYZERS)}; available: {', '.join(ANALYZERS)})")
+    run.add_argument("--workers", type=int, default=None,
+                     help="number of worker processes (default: one per CPU core)")
+    run.add_argument("--recursive", action="store_true", help="descend into subfolders")
+    run.add_argument("--no-cache", action="store_true", help="always re-extract, ignoring the extraction cache")
+    run.add_argument("--ocr-tier", choices=list(OCR_TIERS), default=OCR_TIER,
+                     help=f"OCR speed/accuracy tier for scanned pages and images (default: {OCR_TIER})")
+    run.add_argument("--index", metavar="DB", default=None,
+                     help="also write all outputs and the text to this SQLite results index (see results_index.py)")
+    add_budget_arguments(run)
+
+    args = parser.parse_args(argv)
+    if args.no_cache:
+        set_cache(None)
+    set_ocr_tier(args.ocr_tier)
+    apply_budget_arguments(args)
+    try:
+        resolve_analyzers(args.analyzers)
+    except ValueError as e:
+        parser.error(str(e))
+
+    from pii_scan import expand_paths
+
+    def report(record):
+        print(f"[{record['status'].upper()}] {record['path']} ({', '.join(record['outputs']) or 'no output'})")
+
+    total = sweep(expand_paths(args.paths, recursive=args.recursive), args.out, analyzers=args.analyzers,
+                  workers=args.workers, on_result=report, index_path=args.index)
+    print(f"[INFO] Analyzed {total} files. Output saved to: {os.path.abspath(args.out)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
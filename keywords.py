@@ -0,0 +1,70 @@
+import re
+
+try:
+    import ahocorasick  # pyahocorasick, optional C implementation
+except ImportError:
+    ahocorasick = None
+
+# ----------------------------- Keyword automaton -----------------------------
+# Finds every occurrence of many keywords in a single pass over the text instead of
+# one substring search per keyword. Uses pyahocorasick when it is installed; otherwise
+# the keywords are compiled into one trie-shaped regex that is tried at every position.
+
+
+def _trie_pattern(keywords) -> str:
+    root = {}
+    for keyword in keywords:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if '' in node:
+            return '(?:' + '|'.join(branches) + ')?'  # greedy: the longest keyword wins
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return build(root)
+
+
+class KeywordMatcher:
+    """Match a fixed set of keywords, overlapping occurrences included.
+
+    Matching is exact; callers that want case-insensitive matching pass lowercased
+    keywords and text.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted(set(k for k in keywords if k))
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            if self.keywords:
+                self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._pattern = re.compile('(?=(' + _trie_pattern(self.keywords) + '))') if self.keywords else None
+            # The regex reports the longest keyword at each position; shorter keywords
+            # that are prefixes of it match there too
+            self._prefixes = {k: [p for p in self.keywords if k.startswith(p)] for k in self.keywords}
+
+    def finditer(self, text):
+        """Yield (start, end, keyword) for every occurrence of every keyword in `text`."""
+        if not self.keywords:
+            return
+        if self._automaton is not None:
+            for last, keyword in self._automaton.iter(text):
+                yield last - len(keyword) + 1, last + 1, keyword
+            return
+        for m in self._pattern.finditer(text):
+            start = m.start()
+            for keyword in self._prefixes[m.group(1)]:
+                yield start, start + len(keyword), keyword
+
+    def found(self, text) -> set:
+        """The set of keywords that occur in `text`."""
+        return {keyword for _, _, keyword in self.finditer(text)}
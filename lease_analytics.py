@@ -0,0 +1,456 @@
+import os
+import re
+import time
+from datetime import date
+from functools import lru_cache, partial
+from pathlib import Path
+
+# --- External libraries ---
+import dateparser
+
+from batch import Reorder, run_batch
+from budgets import BudgetExceeded, file_budget, get_budgets, stage_budget
+from ingest import extract_document
+from keywords import KeywordMatcher
+from manifest import Manifest, tracked
+from metrics import MetricsRecorder, format_summary, measured, parent_stage, stage
+from results_index import ResultsIndex
+from sinks import CsvSink, JsonlSink, ParquetSink, filter_jsonl, read_jsonl
+from watch import DEBOUNCE_SECONDS, watch_folder as watch_drop_folder
+
+# EasyOCR is loaded lazily, the first time a scanned PDF needs it
+OCR_LANGUAGES = ('en', 'af')  # English + Afrikaans
+OCR_GPU = True  # EasyOCR falls back to CPU when no GPU is available
+OCR_TIER = 'balanced'  # scanned clauses need the words right; see ocr.OCR_TIERS
+
+INPUT_EXTENSIONS = ['.pdf', '.docx', '.txt']  # read through ingest.py, sharing its extraction cache
+MANIFEST_NAME = 'manifest.json'
+RESULTS_JSONL = 'results.jsonl'
+SUMMARY_CSV = 'summary.csv'
+SUMMARY_PARQUET = 'summary.parquet'
+METRICS_JSONL = 'metrics.jsonl'
+SUMMARY_COLUMNS = ['file_name', 'health_score', 'parties', 'dates', 'monetary_values', 'clauses', 'clause_spans',
+                   'compliance_flags', 'page_sources', 'status']
+
+# ----------------------------- Text extraction -----------------------------
+def read_document(path: Path) -> dict:
+    """The ingest.py document of a lease, with this tool's OCR settings; raises if it could not be read.
+
+    Served from the shared extraction cache when the file's content has not changed.
+    """
+    document = extract_document(path, OCR_LANGUAGES, gpu=OCR_GPU, tier=OCR_TIER)
+    if document['error']:
+        raise RuntimeError(document['error'])
+    return document
+
+
+def extract_pages_from_pdf(path: Path) -> list:
+    """Per-page text of a PDF: pdfplumber where a page has a text layer, EasyOCR where it does not."""
+    return read_document(path)['pages']
+
+
+def extract_text_from_pdf(path: Path) -> str:
+    """Extract text from a PDF using pdfplumber, with EasyOCR for image-only pages."""
+    return read_document(path)['text']
+
+
+def extract_text_from_docx(path: Path) -> str:
+    """Body, tables, headers, footers and footnotes of a .docx."""
+    return read_document(path)['text']
+
+# ----------------------------- SA-specific regex -----------------------------
+DATE_REGEX = re.compile(r"\b\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4}\b")
+# Month names in English and Afrikaans, longest first so "September" wins over "Sep"
+MONTH_NAMES = sorted({
+    'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october',
+    'november', 'december', 'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+    'januarie', 'februarie', 'maart', 'mei', 'junie', 'julie', 'augustus', 'oktober', 'desember', 'mrt', 'okt', 'des',
+}, key=len, reverse=True)
+_MONTH = r"(?:" + "|".join(MONTH_NAMES) + r")\.?"
+# Cheap candidate spans for find_dates: numeric dates plus dates written with a month name
+DATE_CANDIDATE_REGEX = re.compile(
+    DATE_REGEX.pattern
+    + r"|\b\d{1,2}\.\d{1,2}\.\d{2,4}\b"
+    + r"|\b\d{4}[\/\-]\d{1,2}[\/\-]\d{1,2}\b"
+    + r"|\b\d{1,2}(?:st|nd|rd|th|ste|de)?\s+(?:(?:day\s+)?of\s+|(?:dag\s+)?van\s+)?" + _MONTH
+    + r"(?:,?\s+\d{4})?\b"
+    + r"|\b" + _MONTH + r"\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?\b"
+    + r"|\b" + _MONTH + r"\s+\d{4}\b",
+    re.I,
+)
+# Year first: dateparser's DMY order would read these as day-month-year and reject them
+ISO_DATE_REGEX = re.compile(r"(\d{4})[\/\-](\d{1,2})[\/\-](\d{1,2})")
+DATE_LANGUAGES = ['en', 'af']
+MONEY_REGEX = re.compile(r"\b(?:R|ZAR)?\s?\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?\b")
+
+CLAUSE_KEYWORDS = {
+    'rent': ['rent', 'monthly rental', 'base rent', 'huur'],
+    'deposit': ['security deposit', 'deposit', 'borg'],
+    'termination': ['termination', 'cancel', 'notice period', 'opzegging'],
+    'maintenance': ['maintenance', 'repair', 'landlord shall', 'tenant shall'],
+    'utilities': ['utilities', 'electricity', 'water', 'municipal rates'],
+    'law': ['Rental Housing Act', 'Consumer Protection Act', 'CPA', 'South African law'],
+    'governing_law': ['governing law', 'jurisdiction', 'South Africa']
+}
+CLAUSE_CONTEXT_BEFORE = 100
+CLAUSE_CONTEXT_AFTER = 300
+
+# Every clause keyword, lowercased, mapped to the categories it belongs to
+_CLAUSE_CATEGORIES = {}
+for _category, _keywords in CLAUSE_KEYWORDS.items():
+    for _keyword in _keywords:
+        _CLAUSE_CATEGORIES.setdefault(_keyword.lower(), []).append(_category)
+_CLAUSE_MATCHER = KeywordMatcher(_CLAUSE_CATEGORIES)
+
+# ----------------------------- Extraction logic -----------------------------
+_DATE_NOISE_REGEX = re.compile(r"(?<=\d)(?:st|nd|rd|th|ste|de)\b|\b(?:day\s+)?of\b|\b(?:dag\s+)?van\b", re.I)
+
+
+def _normalize_date_candidate(span: str) -> str:
+    """Lowercase, drop ordinal suffixes and "(day) of"/"(dag) van", collapse whitespace."""
+    return " ".join(_DATE_NOISE_REGEX.sub(" ", span.lower()).split()).replace(" ,", ",")
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(candidate: str):
+    iso = ISO_DATE_REGEX.fullmatch(candidate)
+    if iso:
+        try:
+            return date(*map(int, iso.groups())).isoformat()
+        except ValueError:
+            return None
+    parsed = dateparser.parse(candidate, languages=DATE_LANGUAGES, settings={'DATE_ORDER': 'DMY'})
+    return parsed.date().isoformat() if parsed else None
+
+
+def find_dates(text: str):
+    """Dates in `text` as ISO strings.
+
+    Candidate spans are found with DATE_CANDIDATE_REGEX and only those short spans are
+    handed to dateparser, memoized by their normalized text, instead of running
+    search_dates over the whole document.
+    """
+    dates = set()
+    for m in DATE_CANDIDATE_REGEX.finditer(text):
+        parsed = _parse_date(_normalize_date_candidate(m.group(0)))
+        if parsed:
+            dates.add(parsed)
+    return list(dates)
+
+def find_money(text: str):
+    return list(set([m.group(0) for m in MONEY_REGEX.finditer(text)]))
+
+def extract_parties(text: str):
+    pattern = re.compile(r"between\s+(.*?)\s+and\s+(.*?)\s", re.I)
+    m = pattern.search(text[:2000])
+    if m:
+        return [m.group(1).strip(), m.group(2).strip()]
+    return []
+
+def _merge_spans(spans: list) -> list:
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def index_clauses(text: str) -> dict:
+    """Context windows around every occurrence of every clause keyword, in one pass.
+
+    Returns {category: [[start, end], ...]} with overlapping windows merged. Each window
+    runs from CLAUSE_CONTEXT_BEFORE characters before a keyword to CLAUSE_CONTEXT_AFTER
+    characters after its start.
+    """
+    windows = {category: [] for category in CLAUSE_KEYWORDS}
+    for start, _, keyword in _CLAUSE_MATCHER.finditer(text.lower()):
+        span = (max(0, start - CLAUSE_CONTEXT_BEFORE), min(len(text), start + CLAUSE_CONTEXT_AFTER))
+        for category in _CLAUSE_CATEGORIES[keyword]:
+            windows[category].append(span)
+    return {category: _merge_spans(spans) for category, spans in windows.items()}
+
+def extract_lease_fields(text: str) -> dict:
+    with stage('find_dates'), stage_budget('find_dates'):
+        dates = find_dates(text)
+    with stage('field_regex'):
+        result = {
+            'dates': dates,
+            'monetary_values': find_money(text),
+            'parties': extract_parties(text),
+            'clauses': {},
+            'compliance_flags': []
+        }
+    with stage('clause_search'), stage_budget('clause_search'):
+        result['clause_spans'] = index_clauses(text)
+    for key, spans in result['clause_spans'].items():
+        result['clauses'][key] = [text[start:end] for start, end in spans]
+
+    # Check deposit compliance
+    deposits = [float(re.sub(r'[^\d.]', '', val)) for val in result['monetary_values'] if 'R' in val or 'ZAR' in val]
+    if deposits:
+        max_deposit = max(deposits)
+        rent_candidates = [float(re.sub(r'[^\d.]', '', val)) for val in result['monetary_values']]
+        if rent_candidates and max_deposit > (2 * max(rent_candidates)):
+            result['compliance_flags'].append('Deposit exceeds 2 months rent')
+
+    # Ensure governing law is specified
+    if not result['clauses']['governing_law']:
+        result['compliance_flags'].append('Missing governing law clause')
+
+    return result
+
+def compute_health_score(extracted: dict) -> int:
+    score = 100
+    if not extracted['parties']:
+        score -= 15
+    if not extracted['clauses']['rent']:
+        score -= 20
+    if not extracted['clauses']['deposit']:
+        score -= 10
+    if not extracted['clauses']['termination']:
+        score -= 10
+    if 'Deposit exceeds 2 months rent' in extracted['compliance_flags']:
+        score -= 15
+    if 'Missing governing law clause' in extracted['compliance_flags']:
+        score -= 10
+    return max(0, score)
+
+# ----------------------------- Processing -----------------------------
+def process_file(path: Path, keep_text=False):
+    """Analyze one lease within the budgets of budgets.py.
+
+    'status' is 'ok', 'partial' when pages were left un-OCRed or the text was cut to
+    max_scan_chars, or 'deferred' when the lease ran out of time; a deferred result has
+    no fields and no health score. 'over_budget' says which limits were hit. With
+    `keep_text`, 'text' holds the extracted text.
+    """
+    path = Path(path)
+    try:
+        with file_budget():
+            document = read_document(path)
+            extracted = lease_fields(document['text'], document['page_sources'])
+    except BudgetExceeded as e:
+        print(f"[INFO] Deferred, {e}: {path}")
+        return deferred_record(path, [str(e)])
+    extracted['file_name'] = path.name
+    extracted['health_score'] = compute_health_score(extracted)
+    if keep_text:
+        extracted['text'] = document['text']
+    return extracted
+
+def lease_fields(text: str, page_sources=()) -> dict:
+    """extract_lease_fields() within the character budget, with 'page_sources', 'status' and 'over_budget'."""
+    page_sources = list(page_sources)
+    over_budget = []
+    if 'skipped' in page_sources:
+        over_budget.append(f"{page_sources.count('skipped')} scanned pages not OCRed")
+    max_chars = get_budgets().max_scan_chars
+    if max_chars is not None and len(text) > max_chars:
+        over_budget.append(f"only the first {max_chars} characters analyzed")
+        text = text[:max_chars]
+
+    extracted = extract_lease_fields(text)
+    extracted['page_sources'] = page_sources  # 'text', 'ocr' or 'skipped' for every PDF page
+    extracted['status'] = 'partial' if over_budget else 'ok'
+    extracted['over_budget'] = over_budget
+    return extracted
+
+def deferred_record(path, over_budget) -> dict:
+    """The result of a lease that ran out of time; `over_budget` lists the reasons."""
+    return {'file_name': Path(path).name, 'health_score': None, 'page_sources': [], 'status': 'deferred',
+            'over_budget': list(over_budget)}
+
+def process_all_files(input_folder, output_folder, progress_callback=None, workers=None, incremental=False,
+                      parquet=False, on_result=None, on_progress=None, cancel=None, metrics=True,
+                      profile_dir=None, index_path=None):
+    """Analyze every lease in `input_folder` using `workers` processes (default: all cores).
+
+    Each result is appended to results.jsonl and summary.csv (and to a summary.parquet
+    dataset with `parquet`) as soon as it is ready, in sorted file order, so nothing is
+    held in memory and a crash leaves the output written so far intact. `on_result` is
+    called with each result in completion order and `on_progress` with (done, total)
+    after every file. Setting the `cancel` event stops the run early, keeping the
+    output written so far.
+
+    With `incremental`, a manifest in `output_folder` records what was already analyzed:
+    only new or changed files are processed, results of deleted files are dropped, and
+    earlier results of unchanged files are kept, ahead of the new ones. Rerunning an
+    interrupted incremental run picks up where it stopped. Results that watch_folder()
+    recorded for leases in subfolders are kept as they are. Returns the number of
+    results in the summary.
+
+    Per-file stage timings, counters and memory are written to metrics.jsonl in
+    `output_folder` and a summary of the run is reported through `progress_callback`,
+    unless `metrics` is False; `profile_dir` additionally saves a cProfile .prof file per lease.
+
+    With `index_path`, every analyzed lease's fields and text are also written to that
+    results index (results_index.py); leases left out of an incremental run keep what
+    earlier runs indexed.
+    """
+    in_path = Path(input_folder)
+    out_path = Path(output_folder)
+    out_path.mkdir(parents=True, exist_ok=True)
+    results_path = out_path / RESULTS_JSONL
+
+    files = sorted(p for p in in_path.iterdir() if p.is_file() and p.suffix.lower() in INPUT_EXTENSIONS)
+    results_db = ResultsIndex(index_path) if index_path else None
+    manifest = None
+    todo = files
+    kept = set()
+    if incremental:
+        manifest = Manifest(out_path / MANIFEST_NAME)
+        todo_names, unchanged, deleted = manifest.plan({p.name: p for p in files})
+        # Leases in subfolders (keyed sub/x.pdf) come from watch mode; this run does not list them
+        deleted = [name for name in deleted if '/' not in name]
+        for name in deleted:
+            manifest.remove(name)
+            if results_db:
+                results_db.remove(in_path / name)
+        unchanged = set(unchanged)
+        # Watch mode appends a new record when a lease changes, so the last one per name is current
+        latest = {}
+        for position, record in enumerate(read_jsonl(results_path)):
+            latest[record.get('file_name')] = position
+        position = -1
+
+        def keep(record):
+            nonlocal position
+            position += 1
+            name = record.get('file_name', '')
+            if (name in unchanged or '/' in name) and latest.get(name) == position:
+                kept.add(name)
+                return True
+            return False
+
+        filter_jsonl(results_path, keep)
+        # Unchanged files whose result is missing from results.jsonl are analyzed again
+        todo = [p for p in files if p.name not in kept]
+        if progress_callback:
+            progress_callback(f"{len(todo)} new or changed, {len(kept)} unchanged, {len(deleted)} removed")
+
+    sinks = [JsonlSink(results_path, append=incremental), CsvSink(out_path / SUMMARY_CSV, SUMMARY_COLUMNS)]
+    if parquet:
+        sinks.append(ParquetSink(out_path / SUMMARY_PARQUET, SUMMARY_COLUMNS, types={'health_score': 'int64'}))
+    recorder = MetricsRecorder(out_path / METRICS_JSONL) if metrics or profile_dir else None
+    try:
+        # The summaries are rebuilt from the results kept in results.jsonl
+        for record in read_jsonl(results_path) if kept else []:
+            for sink in sinks[1:]:
+                sink.write(record)
+
+        func = partial(process_file, keep_text=True) if results_db else process_file
+        if manifest:
+            func = tracked(func)
+        if recorder:
+            func = measured(func, profile_dir)
+        order = Reorder()
+        written = len(kept)
+        if on_progress:
+            on_progress(0, len(todo))
+        for done, (i, p, data) in enumerate(run_batch(func, todo, workers=workers, cancel=cancel), 1):
+            if progress_callback:
+                progress_callback(f"Processed {done}/{len(todo)}: {p.name}")
+            if on_progress:
+                on_progress(done, len(todo))
+            if recorder and data is not None:
+                data = recorder.add(data)
+            stamp = None
+            if manifest and data is not None:
+                stamp, data = data, data['result']
+            if results_db and data is not None:
+                with parent_stage(recorder, 'index'):
+                    results_db.add(p, lease=data, text=data.pop('text', None))
+            if data is None:
+                if manifest:
+                    manifest.remove(p.name)  # retry on the next run
+            elif on_result:
+                on_result(data)
+
+            for ready_path, ready_stamp, record in order.push(i, (p, stamp, data)):
+                if record is None:
+                    continue
+                with parent_stage(recorder, 'write'):
+                    for sink in sinks:
+                        sink.write(record)
+                if manifest and record['status'] == 'deferred':
+                    manifest.remove(ready_path.name)  # retry on the next run
+                elif manifest:
+                    manifest.record(ready_path.name, ready_stamp, RESULTS_JSONL)
+                written += 1
+    finally:
+        for sink in sinks:
+            sink.close()
+        if results_db:
+            results_db.close()
+        if manifest:
+            manifest.save()
+        summary = recorder.close() if recorder else None
+
+    if progress_callback and summary:
+        progress_callback(format_summary(summary))
+    if progress_callback:
+        if cancel is not None and cancel.is_set():
+            progress_callback(f"Cancelled. {written} files in summary.")
+        else:
+            progress_callback(f"Processing complete! {len(todo)} files analyzed, {written} in summary.")
+    return written
+
+
+def watch_folder(input_folder, output_folder, workers=None, on_result=None, stop=None, debounce=DEBOUNCE_SECONDS):
+    """Analyze every lease that lands in `input_folder` (recursively) as soon as it has arrived.
+
+    Results are appended to results.jsonl and summary.csv in `output_folder` and recorded
+    in its manifest, so leases analyzed by this or an incremental process_all_files run
+    are not analyzed again. A record's file_name is the lease's path relative to
+    `input_folder`; a lease that changes gets a new record, which an incremental run
+    prefers over the earlier ones. Runs until `stop` is set or the process is interrupted.
+    """
+    in_path = Path(input_folder)
+    out_path = Path(output_folder)
+    out_path.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest(out_path / MANIFEST_NAME)
+    last_save = time.monotonic()
+
+    def key(path):
+        # Matches the file-name keys of process_all_files for leases at the top level
+        return Path(path).relative_to(in_path.resolve()).as_posix()
+
+    def skip(path):
+        return manifest.unchanged(key(path), path)
+
+    sinks = [JsonlSink(out_path / RESULTS_JSONL, append=True),
+             CsvSink(out_path / SUMMARY_CSV, SUMMARY_COLUMNS, append=True)]
+
+    def write(path, data):
+        nonlocal last_save
+        if data is None:
+            manifest.remove(key(path))
+            return
+        stamp, record = data, data['result']
+        # Named like its manifest key, so sub/x.pdf and a top-level x.pdf stay apart
+        record['file_name'] = key(path)
+        for sink in sinks:
+            sink.write(record)
+        if record['status'] == 'deferred':
+            manifest.remove(key(path))  # analyzed again on the next start
+        else:
+            manifest.record(key(path), stamp, RESULTS_JSONL)
+        if time.monotonic() - last_save > 5:
+            manifest.checkpoint()
+            last_save = time.monotonic()
+        if record['status'] == 'deferred':
+            print(f"[INFO] Deferred {path}: {'; '.join(record['over_budget'])}")
+        else:
+            print(f"[INFO] Analyzed {path} (health score {record['health_score']})")
+        if on_result:
+            on_result(record)
+
+    try:
+        watch_drop_folder(in_path.resolve(), tracked(process_file), write, extensions=INPUT_EXTENSIONS, skip=skip,
+                          workers=workers, stop=stop, debounce=debounce)
+    finally:
+        for sink in sinks:
+            sink.close()
+        manifest.save()
@@ -0,0 +1,133 @@
+import json
+import os
+from functools import partial
+
+from cache import file_digest
+from sinks import _drop_torn_line
+
+# ----------------------------- Incremental runs -----------------------------
+# A manifest remembers, for every file already processed, its size, mtime, content
+# hash and where its result went. The next run only reprocesses files that are new or
+# whose content changed, and drops entries for files that disappeared.
+#
+# During a run, changes are appended to a log next to the manifest (one JSON line per
+# recorded or removed key) rather than rewriting the whole file, so checkpoints cost
+# as much as the files they cover. Loading replays the log; save() folds it into the
+# manifest at the end of a run.
+
+MANIFEST_VERSION = 1
+CHECKPOINT_EVERY = 100  # append to the log this often so a crash loses little work
+LOG_SUFFIX = '.log'
+
+
+class Manifest:
+    def __init__(self, path):
+        self.path = str(path)
+        self.log_path = self.path + LOG_SUFFIX
+        self.entries = {}
+        self._unsaved = []
+        current = True
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            current = data.get('version') == MANIFEST_VERSION
+            if current:
+                self.entries = data['entries']
+        if current and os.path.exists(self.log_path):
+            self._replay()
+
+    def _replay(self):
+        # Cut off a line a crash left half-written, so the next checkpoint starts on a line of its own
+        _drop_torn_line(self.log_path)
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    change = json.loads(line)
+                except ValueError:
+                    continue
+                if change['entry'] is None:
+                    self.entries.pop(change['key'], None)
+                else:
+                    self.entries[change['key']] = change['entry']
+
+    def plan(self, files):
+        """Split `files` into (todo, unchanged, deleted).
+
+        `files` maps manifest keys to file paths. A file whose size and mtime match its
+        entry is unchanged without being read; otherwise its hash decides. `deleted` lists
+        keys of entries whose file is gone.
+        """
+        todo, unchanged = [], []
+        for key, path in files.items():
+            (unchanged if self.unchanged(key, path) else todo).append(key)
+        deleted = [key for key in self.entries if key not in files]
+        return todo, unchanged, deleted
+
+    def unchanged(self, key, path) -> bool:
+        """Whether `path` still matches its entry: same size and mtime, or else same hash."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        stat = os.stat(path)
+        if entry['size'] != stat.st_size:
+            return False
+        if entry['mtime'] == stat.st_mtime:
+            return True
+        if entry['sha256'] == file_digest(path):
+            entry['mtime'] = stat.st_mtime  # touched, not modified
+            return True
+        return False
+
+    def record(self, key, tracked, result):
+        """Store the outcome of a tracked() call for `key` along with its result location."""
+        self.entries[key] = {
+            'size': tracked['size'],
+            'mtime': tracked['mtime'],
+            'sha256': tracked['sha256'],
+            'result': result,
+        }
+        self._changed(key)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._changed(key)
+        return entry
+
+    def _changed(self, key):
+        self._unsaved.append({'key': key, 'entry': self.entries.get(key)})
+        if len(self._unsaved) >= CHECKPOINT_EVERY:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Append the changes since the last checkpoint to the log."""
+        if not self._unsaved:
+            return
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(change, ensure_ascii=False) + '\n' for change in self._unsaved)
+        self._unsaved = []
+
+    def save(self):
+        """Write the whole manifest and drop the log it now includes."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self._unsaved = []
+
+
+def _run_tracked(func, path):
+    stat = os.stat(path)
+    digest = file_digest(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': digest, 'result': func(path)}
+
+
+def tracked(func):
+    """Wrap `func(path)` so it also returns the file's size, mtime and hash.
+
+    The wrapper is picklable, so hashing happens in the worker process next to the
+    extraction rather than serially in the parent.
+    """
+    return partial(_run_tracked, func)
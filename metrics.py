@@ -0,0 +1,208 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from functools import partial
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+# ----------------------------- Run metrics -----------------------------
+# Pipelines mark their stages with `with stage('ocr'):` and their work with
+# count('pages', n). Nothing is recorded unless the file is being processed under
+# measured(), so the markers cost one global lookup in normal runs. A measured call
+# returns its result together with the file's stage timings, counters and memory, and
+# a MetricsRecorder in the parent writes them to a JSONL file and sums up the run.
+
+_current = None  # metrics of the file being processed in this process
+_lock = threading.Lock()  # stages can run on helper threads (page rendering)
+
+
+class FileMetrics:
+    def __init__(self, path):
+        self.path = str(path)
+        self.stages = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.samples = defaultdict(list)
+
+    def to_dict(self) -> dict:
+        return {'path': self.path, 'stages': dict(self.stages), 'counts': dict(self.counts),
+                'samples': dict(self.samples)}
+
+
+@contextmanager
+def stage(name):
+    """Add the time spent in the block to stage `name` of the current file."""
+    metrics = _current
+    if metrics is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        with _lock:
+            metrics.stages[name] += elapsed
+
+
+def count(name, n=1):
+    """Add `n` to counter `name` of the current file (pages, OCR pages, ...)."""
+    metrics = _current
+    if metrics is not None:
+        with _lock:
+            metrics.counts[name] += n
+
+
+def sample(name, value):
+    """Record one value of a per-item measurement, e.g. the OCR time of one page."""
+    metrics = _current
+    if metrics is not None:
+        with _lock:
+            metrics.samples[name].append(round(value, 4))
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _run_measured(func, profile_dir, path):
+    global _current
+    metrics = FileMetrics(path)
+    try:
+        metrics.counts['bytes'] = os.path.getsize(path)
+    except OSError:
+        pass
+    rss_before = peak_rss_mb()
+    _current = metrics
+    t0 = time.perf_counter()
+    try:
+        if profile_dir:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            result = profiler.runcall(func, path)
+            name = re.sub(r'[^\w.-]', '_', os.path.basename(str(path)))
+            profiler.dump_stats(os.path.join(profile_dir, f"{os.getpid()}-{name}.prof"))
+        else:
+            result = func(path)
+    finally:
+        _current = None
+    record = metrics.to_dict()
+    record['seconds'] = time.perf_counter() - t0
+    record['peak_rss_mb'] = peak_rss_mb()
+    # Non-zero only for the file that pushed this worker to a new memory peak
+    if rss_before is not None:
+        record['rss_growth_mb'] = round(record['peak_rss_mb'] - rss_before, 1)
+    record['pid'] = os.getpid()
+    return {'result': result, 'metrics': record}
+
+
+def measured(func, profile_dir=None):
+    """Wrap `func(path)` so it returns {'result': ..., 'metrics': {...}}.
+
+    With `profile_dir`, each call also runs under cProfile and leaves a .prof file there.
+    Picklable, like manifest.tracked(), so it runs inside the worker process.
+    """
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+    return partial(_run_measured, func, profile_dir)
+
+
+class MetricsRecorder:
+    """Writes per-file metrics to a JSONL file as they arrive and summarizes the run.
+
+    Each line is one file's record; close() appends a line with "summary": true.
+    """
+
+    def __init__(self, path, slowest=10):
+        self.path = str(path)
+        self.slowest = slowest
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self.started = time.perf_counter()
+        self.files = 0
+        self.stages = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.peak_rss_mb = None
+        self._records = []  # (seconds, path, top stage), trimmed to the slowest
+
+    def add(self, measured_result):
+        """Record the metrics of a measured() call and return the wrapped result."""
+        record = measured_result['metrics']
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self.files += 1
+        for name, seconds in record['stages'].items():
+            self.stages[name] += seconds
+        for name, n in record['counts'].items():
+            self.counts[name] += n
+        if record.get('peak_rss_mb') is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb or 0, record['peak_rss_mb'])
+        top = max(record['stages'].items(), key=lambda item: item[1])[0] if record['stages'] else None
+        self._records.append((record['seconds'], record['path'], top))
+        if len(self._records) > 4 * self.slowest:
+            self._records = sorted(self._records, reverse=True)[:self.slowest]
+        return measured_result['result']
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage that runs in the parent process, such as writing output."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - t0
+
+    def summary(self) -> dict:
+        wall = time.perf_counter() - self.started
+        return {
+            'summary': True,
+            'files': self.files,
+            'wall_seconds': round(wall, 3),
+            'files_per_second': round(self.files / wall, 2) if wall else None,
+            'stages': {name: round(seconds, 3) for name, seconds in
+                       sorted(self.stages.items(), key=lambda item: item[1], reverse=True)},
+            'counts': dict(self.counts),
+            'peak_rss_mb': self.peak_rss_mb,
+            'slowest': [{'path': path, 'seconds': round(seconds, 3), 'top_stage': top}
+                        for seconds, path, top in sorted(self._records, reverse=True)[:self.slowest]],
+        }
+
+    def close(self):
+        summary = self.summary()
+        self._file.write(json.dumps(summary, ensure_ascii=False) + '\n')
+        self._file.close()
+        return summary
+
+
+def parent_stage(recorder, name):
+    """recorder.stage(name), or a no-op when the run is not recording metrics."""
+    return recorder.stage(name) if recorder is not None else nullcontext()
+
+
+def format_summary(summary) -> str:
+    """A short human-readable report of a MetricsRecorder summary."""
+    lines = [f"{summary['files']} files in {summary['wall_seconds']:.1f}s "
+             f"({summary['files_per_second'] or 0:.1f} files/s), peak RSS {summary['peak_rss_mb']} MB"]
+    counts = summary['counts']
+    if counts:
+        lines.append("  " + ", ".join(f"{name} {n}" for name, n in sorted(counts.items())))
+    lines.append("  time by stage (summed over workers):")
+    for name, seconds in summary['stages'].items():
+        lines.append(f"    {name:16} {seconds:10.2f}s")
+    if summary['slowest']:
+        lines.append("  slowest files:")
+        for item in summary['slowest']:
+            lines.append(f"    {item['seconds']:8.2f}s  {item['top_stage'] or '-':14} {item['path']}")
+    return "\n".join(lines)
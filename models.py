@@ -0,0 +1,47 @@
+import threading
+
+# ----------------------------- Lazy model registry -----------------------------
+# Building an OCR reader costs seconds and hundreds of MB, so nothing is loaded at
+# import time. Each model is created the first time it is needed and then reused
+# for the lifetime of the process. Long-lived workers can call preload() up front.
+
+_lock = threading.Lock()
+_models = {}
+
+
+def _load_easyocr(languages, gpu):
+    import easyocr
+    print(f"[INFO] Loading EasyOCR reader ({', '.join(languages)})...")
+    return easyocr.Reader(list(languages), gpu=gpu)
+
+
+def _get_or_load(key, loader):
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = loader()
+                _models[key] = model
+    return model
+
+
+def get_ocr_reader(languages=('en',), gpu=False):
+    """Return the shared EasyOCR reader for `languages`, loading it on first use."""
+    languages = tuple(languages)
+    return _get_or_load(('easyocr', languages, gpu), lambda: _load_easyocr(languages, gpu))
+
+
+def preload(ocr_languages=('en',), gpu=False):
+    """Load models eagerly, e.g. when a worker starts, so the first file pays nothing."""
+    get_ocr_reader(ocr_languages, gpu=gpu)
+
+
+def is_loaded(languages=('en',), gpu=False) -> bool:
+    return ('easyocr', tuple(languages), gpu) in _models
+
+
+def clear():
+    """Drop every loaded model so its memory can be reclaimed."""
+    with _lock:
+        _models.clear()
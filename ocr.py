@@ -0,0 +1,265 @@
+import threading
+import time
+from importlib import metadata
+from itertools import groupby
+from queue import Empty, Full, Queue
+from typing import NamedTuple, Optional
+
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+from budgets import check, stage_budget
+from metrics import count, sample, stage
+from models import get_ocr_reader
+
+# ----------------------------- Page-streaming OCR -----------------------------
+# Scanned PDFs are rasterized one page at a time instead of all at once. A background
+# thread renders the next page (pdftoppm runs outside the GIL) while the current one
+# is being OCRed, and each page image is released as soon as its text is read, so
+# peak memory depends on the page size, not on the number of pages.
+
+DEFAULT_DPI = 200  # pdf2image's default
+_DONE = object()
+
+
+def count_pdf_pages(pdf_path) -> int:
+    return int(pdfinfo_from_path(str(pdf_path))['Pages'])
+
+
+def iter_pdf_pages(pdf_path, dpi=DEFAULT_DPI, pages=None, prefetch=1):
+    """Yield (page_number, image) for `pages` (default: all), rendering at most `prefetch` ahead."""
+    if pages is None:
+        pages = range(1, count_pdf_pages(pdf_path) + 1)
+    pages = list(pages)
+    queue = Queue(maxsize=max(prefetch, 1))
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
+
+    def render():
+        try:
+            for number in pages:
+                if stop.is_set():
+                    return
+                with stage('rasterize'):
+                    images = convert_from_path(str(pdf_path), dpi=dpi, first_page=number, last_page=number)
+                if images:
+                    put((number, images[0]))
+        except Exception as e:
+            put(e)
+        finally:
+            put(_DONE)
+
+    thread = threading.Thread(target=render, name="pdf-render", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Drop whatever was rendered ahead so the thread is not left holding pages
+        while True:
+            try:
+                queue.get_nowait()
+            except Empty:
+                break
+        thread.join()
+
+
+# ----------------------------- OCR tiers -----------------------------
+# Each tier trades accuracy for speed through the rasterization DPI, preprocessing of
+# the page image, the largest side a page may have before it is downscaled, and how
+# many pages are recognized per batch. 'standard' is EasyOCR's own defaults on colour
+# 200 DPI pages, as every scan was read before tiers existed; the PII scanner keeps it
+# until benchmarks/bench_ocr_tiers.py shows 'fast' reads PII as well on real scans.
+# Lease analytics uses 'balanced'. Compare them on your own scans with the benchmark.
+
+class OcrTier(NamedTuple):
+    dpi: int
+    grayscale: bool
+    binarize: bool  # black and white with an Otsu threshold; implies grayscale
+    max_side: Optional[int]  # pages larger than this many pixels are downscaled
+    pages_per_batch: int  # same-sized pages are detected and recognized together
+    canvas_size: int  # EasyOCR's own limit on the detector's input size
+    decoder: str  # 'greedy' or 'beamsearch'
+    recognizer_batch: int  # text lines per recognizer batch
+
+
+OCR_TIERS = {
+    'standard': OcrTier(dpi=200, grayscale=False, binarize=False, max_side=None, pages_per_batch=1,
+                        canvas_size=2560, decoder='greedy', recognizer_batch=1),
+    'fast': OcrTier(dpi=150, grayscale=True, binarize=True, max_side=1800, pages_per_batch=4,
+                    canvas_size=1800, decoder='greedy', recognizer_batch=16),
+    'balanced': OcrTier(dpi=200, grayscale=True, binarize=False, max_side=2560, pages_per_batch=2,
+                        canvas_size=2560, decoder='greedy', recognizer_batch=8),
+    'accurate': OcrTier(dpi=300, grayscale=False, binarize=False, max_side=None, pages_per_batch=1,
+                        canvas_size=3508, decoder='beamsearch', recognizer_batch=1),
+}
+DEFAULT_TIER = 'balanced'
+
+
+def get_tier(tier) -> OcrTier:
+    """Look up a tier by name; an OcrTier is returned as is."""
+    if isinstance(tier, OcrTier):
+        return tier
+    try:
+        return OCR_TIERS[tier]
+    except KeyError:
+        raise ValueError(f"Unknown OCR tier {tier!r}; choose from {', '.join(OCR_TIERS)}") from None
+
+
+def _otsu_threshold(histogram) -> int:
+    """The gray level that best separates a 256-bin histogram into ink and paper."""
+    total = sum(histogram)
+    sum_all = sum(level * count for level, count in enumerate(histogram))
+    sum_below = weight_below = 0
+    best, threshold = -1.0, 127
+    for level, count in enumerate(histogram):
+        weight_below += count
+        if weight_below == 0:
+            continue
+        weight_above = total - weight_below
+        if weight_above == 0:
+            break
+        sum_below += level * count
+        mean_below = sum_below / weight_below
+        mean_above = (sum_all - sum_below) / weight_above
+        between = weight_below * weight_above * (mean_below - mean_above) ** 2
+        if between > best:
+            best, threshold = between, level
+    return threshold
+
+
+def preprocess_image(image, tier=DEFAULT_TIER):
+    """Downscale and convert a PIL image as `tier` says; returns an array EasyOCR accepts.
+
+    Grayscale pages come back 2-D and colour pages in BGR order, which is what EasyOCR
+    expects from an array (it does not accept pdf2image's PIL images directly).
+    """
+    import numpy as np
+
+    tier = get_tier(tier)
+    if tier.max_side and max(image.size) > tier.max_side:
+        image = image.copy()
+        image.thumbnail((tier.max_side, tier.max_side))
+    if tier.grayscale or tier.binarize:
+        image = image.convert('L')
+        if tier.binarize:
+            threshold = _otsu_threshold(image.histogram())
+            image = image.point([0] * (threshold + 1) + [255] * (255 - threshold))
+        return np.asarray(image)
+    return np.ascontiguousarray(np.asarray(image.convert('RGB'))[:, :, ::-1])
+
+
+def _read_batch(reader, batch, tier):
+    """Recognize [(page_number, array)] and yield (page_number, text), batching runs of equal-sized pages."""
+    options = {'decoder': tier.decoder, 'batch_size': tier.recognizer_batch, 'canvas_size': tier.canvas_size}
+    for _, run in groupby(batch, key=lambda page: page[1].shape):
+        run = list(run)
+        t0 = time.perf_counter()
+        with stage('ocr'):
+            if len(run) > 1:
+                results = reader.readtext_batched([array for _, array in run], **options)
+            else:
+                results = [reader.readtext(run[0][1], **options)]
+        count('ocr_pages', len(run))
+        for _ in run:
+            sample('ocr_page_seconds', (time.perf_counter() - t0) / len(run))
+        for (number, _), result in zip(run, results):
+            yield number, " ".join([item[1] for item in result])
+
+
+def ocr_pdf_pages(pdf_path, languages, gpu=False, pages=None, tier=DEFAULT_TIER):
+    """Yield (page_number, text) for each page of a scanned PDF.
+
+    At most one batch of `tier.pages_per_batch` pages is held in memory, as preprocessed
+    arrays; each rendered page image is released as soon as it is converted.
+    """
+    tier = get_tier(tier)
+    reader = get_ocr_reader(languages, gpu=gpu)
+    batch = []
+    for number, image in iter_pdf_pages(pdf_path, dpi=tier.dpi, pages=pages, prefetch=tier.pages_per_batch):
+        check()
+        try:
+            with stage('ocr_preprocess'):
+                batch.append((number, preprocess_image(image, tier)))
+        finally:
+            image.close()
+            del image
+        if len(batch) >= tier.pages_per_batch:
+            yield from _read_batch(reader, batch, tier)
+            batch = []
+    if batch:
+        yield from _read_batch(reader, batch, tier)
+
+
+def ocr_image(image_path, languages, gpu=False, tier=DEFAULT_TIER) -> str:
+    """OCR a single image file with `tier`'s preprocessing."""
+    from PIL import Image
+
+    tier = get_tier(tier)
+    with Image.open(image_path) as image:
+        array = preprocess_image(image, tier)
+    return "".join(text for _, text in _read_batch(get_ocr_reader(languages, gpu=gpu), [(1, array)], tier))
+
+
+# ----------------------------- Per-page hybrid extraction -----------------------------
+# Mixed PDFs (a typed lease with scanned signature or annexure pages) keep the text
+# layer where a page has one, and only image-only pages go through OCR.
+
+MIN_TEXT_CHARS = 25  # fewer non-space characters than this and the page counts as a scan
+
+
+def needs_ocr(page_text) -> bool:
+    return len("".join((page_text or "").split())) < MIN_TEXT_CHARS
+
+
+def hybrid_pdf_pages(pdf_path, text_pages, languages, gpu=False, tier=DEFAULT_TIER, max_pages=None):
+    """Merge a PDF's text layer with OCR of the pages that lack one.
+
+    `text_pages` is the text-layer string of every page in order, or None when the text
+    layer could not be read at all (then every page is OCRed). At most `max_pages` pages
+    are OCRed; the scanned pages after those are left empty with source 'skipped'.
+    Returns a list of {'page': n, 'source': 'text', 'ocr' or 'skipped', 'text': str}.
+    """
+    if text_pages is None:
+        pages = [{'page': number, 'source': 'ocr', 'text': ''}
+                 for number in range(1, count_pdf_pages(pdf_path) + 1)]
+    else:
+        pages = [{'page': number, 'source': 'text', 'text': text or ''}
+                 for number, text in enumerate(text_pages, 1)]
+    count('pages', len(pages))
+    scanned = [page['page'] for page in pages if page['source'] == 'ocr' or needs_ocr(page['text'])]
+    if max_pages is not None and len(scanned) > max_pages:
+        print(f"[INFO] OCR page budget reached: {len(scanned) - max_pages} of {len(scanned)} "
+              f"scanned pages not OCRed in PDF: {pdf_path}")
+        for number in scanned[max_pages:]:
+            pages[number - 1].update(source='skipped', text='')
+        scanned = scanned[:max_pages]
+    if scanned:
+        if text_pages is not None:
+            print(f"[INFO] OCR for {len(scanned)} of {len(pages)} pages in PDF: {pdf_path}")
+        with stage_budget('ocr'):
+            for number, text in ocr_pdf_pages(pdf_path, languages, gpu=gpu, pages=scanned, tier=tier):
+                pages[number - 1].update(source='ocr', text=text)
+    return pages
+
+
+def ocr_settings(languages, tier=DEFAULT_TIER, max_pages=None) -> dict:
+    """Everything that changes OCR output, for keying cached extractions."""
+    try:
+        engine = metadata.version('easyocr')
+    except metadata.PackageNotFoundError:
+        engine = None
+    return {'engine': 'easyocr', 'engine_version': engine, 'languages': list(languages),
+            'tier': get_tier(tier)._asdict(), 'min_text_chars': MIN_TEXT_CHARS, 'max_pages': max_pages}
@@ -0,0 +1,126 @@
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+# ----------------------------- OOXML text extraction -----------------------------
+# .docx and .pptx files are zip archives of XML parts. Reading the parts directly with
+# an incremental parser is much faster than building the python-docx/python-pptx object
+# model, and it also reaches the text those libraries' simple loops miss: tables, text
+# boxes, headers and footers, footnotes and speaker notes.
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+A = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+P = '{http://schemas.openxmlformats.org/presentationml/2006/main}'
+R = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+# Alternate content repeats its text in a fallback for older readers; only the choice is read
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+_WORD_TAGS = {'paragraph': W + 'p', 'text': W + 't', 'tab': W + 'tab', 'breaks': (W + 'br', W + 'cr')}
+_DRAWING_TAGS = {'paragraph': A + 'p', 'text': A + 't', 'tab': None, 'breaks': (A + 'br',)}
+# Parts read after the body, in this order
+_DOCX_EXTRA_PARTS = [re.compile(p) for p in (r'word/header\d*\.xml$', r'word/footer\d*\.xml$',
+                                              r'word/footnotes\.xml$', r'word/endnotes\.xml$')]
+
+
+def _iter_part_paragraphs(archive, name, tags):
+    """Yield the text of every paragraph in one XML part, in document order.
+
+    Elements are cleared as soon as the top-level block holding them is done, so memory
+    stays bounded by the largest paragraph or table rather than the size of the part.
+    A paragraph nested in another one (a text box) is yielded before the one holding it.
+    """
+    paragraph, text, tab, breaks = tags['paragraph'], tags['text'], tags['tab'], tags['breaks']
+    stack = []
+    buffers = []  # text of the open paragraphs, innermost last
+    skipping = 0  # depth inside mc:Fallback
+    with archive.open(name) as f:
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                stack.append(elem)
+                if tag == MC_FALLBACK:
+                    skipping += 1
+                elif tag == paragraph and not skipping:
+                    buffers.append([])
+                continue
+
+            stack.pop()
+            if tag == MC_FALLBACK:
+                skipping -= 1
+            elif skipping or not buffers:
+                pass
+            elif tag == text:
+                if elem.text:
+                    buffers[-1].append(elem.text)
+            elif tag == tab:
+                buffers[-1].append('\t')
+            elif tag in breaks:
+                buffers[-1].append('\n')
+            elif tag == paragraph:
+                yield ''.join(buffers.pop())
+            # Drop finished blocks from the root or document body
+            if 0 < len(stack) <= 2:
+                stack[-1].clear()
+
+
+def _part_number(name):
+    digits = re.search(r'(\d+)\.xml$', name)
+    return int(digits.group(1)) if digits else 0
+
+
+def iter_docx_paragraphs(path):
+    """Yield every paragraph of a .docx: body and tables, then headers, footers, footnotes and endnotes."""
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        parts = ['word/document.xml']
+        for pattern in _DOCX_EXTRA_PARTS:
+            parts.extend(sorted((n for n in names if pattern.match(n)), key=_part_number))
+        for name in parts:
+            yield from _iter_part_paragraphs(archive, name, _WORD_TAGS)
+
+
+def _relationships(archive, names, part):
+    """Map relationship ids to (type, target part name) for `part`; `names` is the set of parts."""
+    directory, base = posixpath.split(part)
+    rels_name = posixpath.join(directory, '_rels', base + '.rels')
+    if rels_name not in names:
+        return {}
+    with archive.open(rels_name) as f:
+        root = ET.parse(f).getroot()
+    return {rel.get('Id'): (rel.get('Type', ''), posixpath.normpath(posixpath.join(directory, rel.get('Target', ''))))
+            for rel in root.iter(REL + 'Relationship') if rel.get('TargetMode') != 'External'}
+
+
+def _slide_names(archive, names):
+    """Slide part names in presentation order, falling back to their numbering."""
+    rels = _relationships(archive, names, 'ppt/presentation.xml')
+    try:
+        with archive.open('ppt/presentation.xml') as f:
+            root = ET.parse(f).getroot()
+        order = [rels[s.get(R + 'id')][1] for s in root.iter(P + 'sldId') if s.get(R + 'id') in rels]
+    except KeyError:
+        order = []
+    if order:
+        return order
+    return sorted((n for n in names if re.match(r'ppt/slides/slide\d+\.xml$', n)), key=_part_number)
+
+
+def iter_pptx_paragraphs(path):
+    """Yield every paragraph of a .pptx, slide by slide: shapes, tables and text boxes, then speaker notes."""
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        for slide in _slide_names(archive, names):
+            yield from _iter_part_paragraphs(archive, slide, _DRAWING_TAGS)
+            for rel_type, target in _relationships(archive, names, slide).values():
+                if rel_type.endswith('/notesSlide'):
+                    yield from _iter_part_paragraphs(archive, target, _DRAWING_TAGS)
+
+
+def docx_text(path) -> str:
+    return '\n'.join(iter_docx_paragraphs(path))
+
+
+def pptx_text(path) -> str:
+    return '\n'.join(iter_pptx_paragraphs(path))
@@ -0,0 +1,738 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from functools import partial
+from typing import NamedTuple
+
+# External libraries
+import PyPDF2
+
+from batch import Reorder, run_batch, worker_setting
+from budgets import (BudgetExceeded, add_budget_arguments, apply_budget_arguments, check, file_budget, get_budgets,
+                     stage_budget)
+from cache import cached_extract, get_cache, set_cache
+from keywords import KeywordMatcher
+from manifest import Manifest, tracked
+from metrics import MetricsRecorder, format_summary, measured, parent_stage, stage
+from ocr import OCR_TIERS, get_tier, hybrid_pdf_pages, ocr_image, ocr_settings
+from ooxml import docx_text, pptx_text
+from results_index import ResultsIndex
+from streams import iter_json_scalars, iter_spreadsheet_rows, iter_text_chunks
+from watch import DEBOUNCE_SECONDS, watch_folder
+
+# EasyOCR is loaded lazily, the first time a scanned page or image needs it
+OCR_LANGUAGES = ('en',)
+OCR_GPU = False  # Set to True if available
+OCR_TIER = 'standard'  # colour 200 DPI, as before tiers existed; see ocr.OCR_TIERS
+
+OUTPUT_CSV = "output_results.csv"
+MANIFEST_SUFFIX = ".manifest.json"  # incremental runs keep their manifest next to the CSV
+METRICS_SUFFIX = ".metrics.jsonl"  # and every run its metrics, unless told otherwise
+
+# Bump when extraction changes so cached text from older versions is not reused
+EXTRACTOR_VERSION = 2
+# Every format read_file understands; watch mode ignores other files
+SCANNED_EXTENSIONS = ['.txt', '.json', '.pdf', '.docx', '.xlsx', '.xls', '.pptx', '.jpg', '.jpeg', '.png', '.tiff']
+# Formats whose extraction costs more than hashing the file; plain text is just read
+CACHED_EXTENSIONS = ['.json', '.pdf', '.docx', '.pptx', '.jpg', '.jpeg', '.png', '.tiff']
+
+# .txt and .json files at least this large are scanned in overlapping windows straight
+# from disk instead of being read into one string (and are not cached)
+STREAM_MIN_BYTES = 32 * 1024 * 1024
+SCAN_WINDOW_CHARS = 1024 * 1024
+SCAN_OVERLAP_CHARS = 4096  # longer than any match, so none is cut at a window boundary
+STREAMED_EXTENSIONS = ['.txt', '.json']
+
+# Spreadsheets are always streamed, every row of every sheet, up to these limits (None: no limit)
+SPREADSHEET_EXTENSIONS = ['.xlsx', '.xls']
+SPREADSHEET_MAX_ROWS = 1_000_000
+SPREADSHEET_MAX_CELLS = 10_000_000
+
+# Regex patterns
+ID_PATTERN = r'(([0-9]{2})(0|1)([0-9])([0-3])([0-9])([-.,#$%& ]?)([0-9]{4})([-.,#$%& ]?)([0-1][8]([-.,#$%& ]?)[0-9]))'
+PASSPORT_PATTERN = r'\b[A|D|M|T][0-9]{8}\b'
+CELLPHONE_PATTERN = r'(?:\+|00)?(?:0|27)?[5-9][0-9](?: )?[0-9]{3}(?: )?[0-9]{4}'
+LANDLINE_PATTERN = r'(?:0|\+27)[0-9]{2}[-. ()]?[0-9]{3}[-. ()]?[0-9]{4}'
+EMAIL_PATTERN = r'[\w\.-]+@(?:[\w-]+\.)+[\w-]{2,4}'
+IPV4_IPV6_PATTERN = r'\b(?:(?:25[0-5]|2[0-4]\d|1\d{2}|[1-9]?\d)(?:\.(?!$)|$)){4}\b|\b(?:[A-Fa-f0-9]{1,4}:){1,7}[A-Fa-f0-9]{1,4}\b'
+countries = [
+    "Afghanistan", "Albania", "Algeria", "Andorra", "Angola", "Antigua and Barbuda", "Argentina", "Armenia",
+    "Australia", "Austria", "Azerbaijan", "Bahamas", "Bahrain", "Bangladesh", "Barbados", "Belarus",
+    "Belgium", "Belize", "Benin", "Bhutan", "Bolivia", "Bosnia and Herzegovina", "Botswana", "Brazil",
+    "Brunei", "Bulgaria", "Burkina Faso", "Burundi", "Cabo Verde", "Cambodia", "Cameroon", "Canada",
+    "Central African Republic", "Chad", "Chile", "China", "Colombia", "Comoros", "Congo (Congo-Brazzaville)",
+    "Costa Rica", "Croatia", "Cuba", "Cyprus", "Czech Republic", "Democratic Republic of the Congo", "Denmark",
+    "Djibouti", "Dominica", "Dominican Republic", "Ecuador", "Egypt", "El Salvador", "Equatorial Guinea",
+    "Eritrea", "Estonia", "Eswatini", "Ethiopia", "Fiji", "Finland", "France", "Gabon", "Gambia", "Georgia",
+    "Germany", "Ghana", "Greece", "Grenada", "Guatemala", "Guinea", "Guinea-Bissau", "Guyana", "Haiti",
+    "Honduras", "Hungary", "Iceland", "India", "Indonesia", "Iran", "Iraq", "Ireland", "Israel", "Italy",
+    "Ivory Coast", "Jamaica", "Japan", "Jordan", "Kazakhstan", "Kenya", "Kiribati", "Kuwait", "Kyrgyzstan",
+    "Laos", "Latvia", "Lebanon", "Lesotho", "Liberia", "Libya", "Liechtenstein", "Lithuania", "Luxembourg",
+    "Madagascar", "Malawi", "Malaysia", "Maldives", "Mali", "Malta", "Marshall Islands", "Mauritania",
+    "Mauritius", "Mexico", "Micronesia", "Moldova", "Monaco", "Mongolia", "Montenegro", "Morocco",
+    "Mozambique", "Myanmar", "Namibia", "Nauru", "Nepal", "Netherlands", "New Zealand", "Nicaragua", "Niger",
+    "Nigeria", "North Korea", "North Macedonia", "Norway", "Oman", "Pakistan", "Palau", "Palestine",
+    "Panama", "Papua New Guinea", "Paraguay", "Peru", "Philippines", "Poland", "Portugal", "Qatar",
+    "Republic of the Congo", "Romania", "Russia", "Rwanda", "Saint Kitts and Nevis", "Saint Lucia",
+    "Saint Vincent and the Grenadines", "Samoa", "San Marino", "Sao Tome and Principe", "Saudi Arabia",
+    "Senegal", "Serbia", "Seychelles", "Sierra Leone", "Singapore", "Slovakia", "Slovenia", "Solomon Islands",
+    "Somalia", "South Africa", "South Korea", "South Sudan", "Spain", "Sri Lanka", "Sudan", "Suriname",
+    "Sweden", "Switzerland", "Syria", "Taiwan", "Tajikistan", "Tanzania", "Thailand", "Timor-Leste", "Togo",
+    "Tonga", "Trinidad and Tobago", "Tunisia", "Turkey", "Turkmenistan", "Tuvalu", "Uganda", "Ukraine",
+    "United Arab Emirates", "United Kingdom", "United States", "Uruguay", "Uzbekistan", "Vanuatu",
+    "Vatican City", "Venezuela", "Vietnam", "Yemen", "Zambia", "Zimbabwe"
+]
+GENDER_PATTERN = r'(?:m|M|male|Male|f|F|female|Female|FEMALE|MALE|Not prefer to say)\b'
+
+race_keywords = [
+    "white", "caucasian", "black", "african american", "afro-american",
+    "asian", "east asian", "south asian", "southeast asian",
+    "hispanic", "latino", "latina",
+    "native american", "indigenous", "first nations", "inuit",
+    "middle eastern", "arab", "persian",
+    "pacific islander", "polynesian", "maori"
+]
+
+# PII categories, in CSV column order
+CATEGORIES = ["ID Number", "Passport Number", "Cellphone Number", "Landline Number", "Email",
+              "IP Address", "Country", "Gender", "Race"]
+CSV_COLUMNS = ["File Name"] + CATEGORIES + ["Status"]
+
+
+def get_file_extension(file_path):
+    return os.path.splitext(file_path)[1].lower()
+
+
+def extract_text_with_easyocr_from_image(image_path):
+    return ocr_image(image_path, OCR_LANGUAGES, gpu=OCR_GPU, tier=OCR_TIER) or ""
+
+
+# ----------------------------- PII scanner -----------------------------
+class PiiMatch(NamedTuple):
+    category: str
+    start: int
+    end: int
+    value: str
+
+
+# The regex categories are scanned independently because their matches overlap (the
+# same digits can be an ID and a phone number) and each category keeps its own
+# non-overlapping findall semantics. Dictionary terms share one keyword automaton.
+def _gated(pattern, first_chars):
+    """Compile `pattern` behind a lookahead on the characters a match can start with.
+
+    The results are identical, but the regex engine rejects most positions on one
+    character test instead of walking the optional prefixes of the pattern.
+    """
+    return re.compile(f'(?=[{first_chars}])(?:{pattern})')
+
+
+_ID_REGEX = _gated(ID_PATTERN, '0-9')
+_ID_SEPARATORS = re.compile(r'[-.,#$%&\s]')
+_EMAIL_REGEX = re.compile(EMAIL_PATTERN)
+_EMAIL_LOCAL_CHAR = re.compile(r'[\w\.-]')
+_REGEX_CATEGORIES = [
+    ("Passport Number", _gated(PASSPORT_PATTERN, 'ADMT|')),
+    ("Cellphone Number", _gated(CELLPHONE_PATTERN, '+0-9')),
+    ("Landline Number", re.compile(LANDLINE_PATTERN)),
+    ("IP Address", _gated(IPV4_IPV6_PATTERN, '0-9A-Fa-f')),
+    ("Gender", re.compile(GENDER_PATTERN)),
+]
+_DICTIONARY = {term.lower(): ("Country", term) for term in countries}
+_DICTIONARY.update({term.lower(): ("Race", term) for term in race_keywords})
+_KEYWORDS = KeywordMatcher(_DICTIONARY)
+
+
+def _iter_emails(text, pos=0):
+    """Same matches as _EMAIL_REGEX.finditer(text, pos), but only tried in front of each '@'.
+
+    A match always starts at the beginning of the [\w.-] run right before an '@', and it
+    succeeds or fails the same way from anywhere in that run, so one attempt per '@' is
+    enough instead of one per character of the text.
+    """
+    # `pos` is the end of the previous match
+    at = text.find('@', pos)
+    while at != -1:
+        start = at
+        while start > pos and _EMAIL_LOCAL_CHAR.match(text, start - 1):
+            start -= 1
+        m = _EMAIL_REGEX.match(text, start) if start < at else None
+        if m:
+            yield m
+            pos = m.end()
+            at = text.find('@', pos)
+        else:
+            at = text.find('@', at + 1)
+
+
+def scan_text(text):
+    """Return every PII match in `text` as PiiMatch spans.
+
+    Regex categories follow findall semantics; every occurrence of a country or race term
+    is reported (offsets into text.lower(), which equal offsets into `text` except for the
+    rare characters whose lowercase form is longer).
+    """
+    return _scan_window(text, 0, 0, len(text), {})
+
+
+def _scan_window(text, base, start, limit, last_end):
+    """Matches in `text` (which begins at offset `base` of the document) starting in [start, limit).
+
+    `last_end` maps each regex category to the end of its previous match, so scanning
+    resumes where a scan of the whole document would have and no match is reported
+    twice; it is updated in place. Offsets in the returned matches are document offsets.
+    """
+    matches = []
+
+    def scan(category, found, value=lambda m: m.group(0)):
+        for m in found:
+            if m.start() + base >= limit:
+                break
+            matches.append(PiiMatch(category, m.start() + base, m.end() + base, value(m)))
+            last_end[category] = m.end() + base
+
+    def pos(category):
+        return max(start, last_end.get(category, 0)) - base
+
+    scan("ID Number", _ID_REGEX.finditer(text, pos("ID Number")), lambda m: _ID_SEPARATORS.sub('', m.group(0)))
+    # An email's start is only known once its '@' is found, so walk from the previous
+    # email and drop the ones that start before this window's share of the document
+    emails = _iter_emails(text, max(0, last_end.get("Email", 0) - base))
+    scan("Email", (m for m in emails if m.start() + base >= start))
+    for category, regex in _REGEX_CATEGORIES:
+        scan(category, regex.finditer(text, pos(category)))
+    for kw_start, kw_end, keyword in _KEYWORDS.finditer(text.lower()):
+        if start <= kw_start + base < limit:
+            category, term = _DICTIONARY[keyword]
+            matches.append(PiiMatch(category, kw_start + base, kw_end + base, term))
+    return matches
+
+
+def scan_chunks(chunks, overlap=SCAN_OVERLAP_CHARS, window_chars=SCAN_WINDOW_CHARS):
+    """scan_text() over a document given as a sequence of text pieces, never joined whole.
+
+    Pieces are gathered into windows of about `window_chars` characters. Each window is
+    scanned together with the last `overlap` characters of the one before it, and matches
+    starting in its final `overlap` characters are left to the next window, so a match
+    that spans a window boundary is still found once, whole, as long as it is shorter
+    than `overlap`.
+    """
+    matches = []
+    last_end = {}
+    window, base = '', 0  # window text and its document offset
+    start = 0  # document offset where the next window's matches begin
+    pieces, pending = [], 0
+
+    def flush(final):
+        nonlocal window, base, start, pieces, pending
+        window = window + ''.join(pieces)
+        pieces, pending = [], 0
+        limit = base + len(window) if final else base + len(window) - overlap
+        matches.extend(_scan_window(window, base, start, limit, last_end))
+        # Keep `overlap` characters before `limit` so matches there see their left context
+        keep_from = max(base, limit - overlap)
+        window, base, start = window[keep_from - base:], keep_from, limit
+
+    for piece in chunks:
+        pieces.append(piece)
+        pending += len(piece)
+        if pending >= window_chars:
+            flush(final=False)
+            check()
+    flush(final=True)
+    return matches
+
+
+def summarize_matches(matches):
+    """Group PiiMatch spans into {category: [matches]} keyed by CATEGORIES.
+
+    Regex categories list every match in text order; countries and races are listed once
+    each, in the order of `countries` and `race_keywords`.
+    """
+    found = {category: [] for category in CATEGORIES}
+    terms = set()
+    for match in sorted(matches, key=lambda m: m.start):
+        if match.category in ("Country", "Race"):
+            terms.add(match.value)
+        else:
+            found[match.category].append(match.value)
+    found["Country"] = [country for country in countries if country in terms]
+    found["Race"] = [race for race in race_keywords if race in terms]
+    return found
+
+
+def search_patterns_in_text(text):
+    """Find every PII category in `text`; returns {category: [matches]} keyed by CATEGORIES."""
+    return summarize_matches(scan_text(text))
+
+
+def read_file(file_path):
+    """Extract the text of `file_path`.
+
+    Returns {'text': str, 'error': str or None, 'page_sources': list}, where 'page_sources'
+    records 'text' or 'ocr' for every page of a PDF. Served from the extraction cache when
+    the file's content has not changed.
+    """
+    if get_file_extension(file_path) in CACHED_EXTENSIONS:
+        return cached_extract(file_path, 'pii.read_file', EXTRACTOR_VERSION, lambda: _read_file(file_path),
+                              settings=ocr_settings(OCR_LANGUAGES, OCR_TIER, get_budgets().max_ocr_pages))
+    return _read_file(file_path)
+
+
+def _read_file(file_path):
+    ext = get_file_extension(file_path)
+    text = ""
+    error = None
+    page_sources = []
+
+    try:
+        if ext == '.txt':
+            with stage('read'), open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+
+        elif ext == '.json':
+            with stage('read'), open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                text = json.dumps(data, indent=2)
+
+        elif ext == '.pdf':
+            with open(file_path, 'rb') as f:
+                with stage('open'):
+                    reader = PyPDF2.PdfReader(f)
+                with stage('text_layer'), stage_budget('text_layer'):
+                    text_pages = [page.extract_text() or '' for page in reader.pages]
+
+            # Text layer where a page has one, OCR only for image-only pages
+            pages = hybrid_pdf_pages(file_path, text_pages, OCR_LANGUAGES, gpu=OCR_GPU, tier=OCR_TIER,
+                                     max_pages=get_budgets().max_ocr_pages)
+            for page in pages:
+                if page['source'] == 'ocr':
+                    text += f'\n\n--- OCR Page {page["page"]} ---\n{page["text"]}'
+                else:
+                    text += page['text']
+            page_sources = [page['source'] for page in pages]
+
+        elif ext == '.docx':
+            with stage('text_layer'), stage_budget('text_layer'):
+                text = docx_text(file_path)
+
+        elif ext == '.pptx':
+            with stage('text_layer'), stage_budget('text_layer'):
+                text = pptx_text(file_path)
+
+        elif ext in ['.jpg', '.jpeg', '.png', '.tiff']:
+            print(f"[INFO] Image file detected: {file_path}. Using OCR...")
+            text = extract_text_with_easyocr_from_image(file_path)
+
+    except Exception as e:
+        print(f"[ERROR] Failed to read file: {file_path}\n{e}")
+        error = str(e)
+
+    return {'text': text, 'error': error, 'page_sources': page_sources}
+
+
+def _new_result(file_path):
+    return {
+        'file_name': os.path.basename(file_path),
+        'path': file_path,
+        'status': 'skipped',
+        'error': None,
+        'page_sources': [],
+        'matches': None,
+        'spans': None,
+        'counts': None,
+        'truncated': False,
+        'over_budget': [],
+    }
+
+
+def _set_matches(result, found):
+    result['status'] = 'partial' if result['over_budget'] else 'ok'
+    result['spans'] = sorted(found, key=lambda m: m.start)
+    result['matches'] = matches = summarize_matches(found)
+    result['counts'] = {category: len(values) for category, values in matches.items()}
+
+
+def process_single_file(file_path, keep_text=False):
+    """Scan one file and return a result dict; nothing is written anywhere.
+
+    'status' is 'ok'; 'partial' when a budget (budgets.py) or the spreadsheet limits cut
+    the scan short, with the matches found in the part that was scanned; 'deferred' when
+    the file ran out of time and has no matches; or 'skipped' when no text could be
+    extracted. 'over_budget' says which limits were hit. 'matches' holds every raw match
+    per category, 'spans' every match as a PiiMatch with its offsets in the text, and
+    'counts' the number of matches per category. 'truncated' is set when a spreadsheet
+    was only scanned up to SPREADSHEET_MAX_ROWS/MAX_CELLS. With `keep_text`, 'text'
+    holds the extracted text (not for files scanned straight from disk).
+    """
+    try:
+        with file_budget():
+            if is_streamed(file_path):
+                return _process_streamed(file_path)
+            extracted = read_file(file_path)
+            result = scan_document(file_path, extracted['text'], extracted['page_sources'], extracted['error'])
+            if keep_text:
+                result['text'] = extracted['text']
+            return result
+    except BudgetExceeded as e:
+        print(f"[INFO] Deferred, {e}: {file_path}")
+        return deferred_result(file_path, [str(e)])
+
+
+def is_streamed(file_path) -> bool:
+    """Whether process_single_file() scans `file_path` straight from disk instead of reading it whole."""
+    ext = get_file_extension(file_path)
+    return ext in SPREADSHEET_EXTENSIONS or (ext in STREAMED_EXTENSIONS and os.path.getsize(file_path) >= STREAM_MIN_BYTES)
+
+
+def deferred_result(file_path, over_budget):
+    """The result of a file that ran out of time; `over_budget` lists the reasons."""
+    result = _new_result(file_path)
+    result['status'] = 'deferred'
+    result['over_budget'] = list(over_budget)
+    return result
+
+
+def scan_document(file_path, text, page_sources=(), error=None):
+    """process_single_file() for text already extracted from `file_path` (see ingest.py)."""
+    result = _new_result(file_path)
+    result['error'] = error
+    result['page_sources'] = list(page_sources)
+    if not text.strip():
+        return result  # Skipped file (no text)
+
+    skipped_pages = result['page_sources'].count('skipped')
+    if skipped_pages:
+        result['over_budget'].append(f"{skipped_pages} scanned pages not OCRed")
+    max_chars = get_budgets().max_scan_chars
+    if max_chars is not None and len(text) > max_chars:
+        result['over_budget'].append(f"only the first {max_chars} of {len(text)} characters scanned")
+        text = text[:max_chars]
+    with stage('regex_scan'), stage_budget('regex_scan'):
+        found = scan_text(text)
+    _set_matches(result, found)
+    return result
+
+
+def set_spreadsheet_limits(max_rows, max_cells):
+    """Change how many rows and non-empty cells of a workbook are scanned (None: no limit)."""
+    global SPREADSHEET_MAX_ROWS, SPREADSHEET_MAX_CELLS
+    SPREADSHEET_MAX_ROWS, SPREADSHEET_MAX_CELLS = max_rows, max_cells
+
+
+def _use_spreadsheet_limits(limits):
+    set_spreadsheet_limits(*limits)
+
+
+worker_setting(lambda: (SPREADSHEET_MAX_ROWS, SPREADSHEET_MAX_CELLS), _use_spreadsheet_limits)
+
+
+def set_ocr_tier(tier):
+    """Switch the OCR tier used for scanned PDFs and images (one of ocr.OCR_TIERS)."""
+    global OCR_TIER
+    get_tier(tier)
+    OCR_TIER = tier
+
+
+worker_setting(lambda: OCR_TIER, set_ocr_tier)
+
+
+def _process_streamed(file_path):
+    """process_single_file() for spreadsheets and large text files, scanned straight from disk."""
+    result = _new_result(file_path)
+    has_text = False
+    max_chars = get_budgets().max_scan_chars
+
+    def truncated(sheet_name):
+        print(f"[INFO] Spreadsheet limit reached in sheet '{sheet_name}', rest not scanned: {file_path}")
+        result['truncated'] = True
+        result['over_budget'].append(f"spreadsheet limit reached in sheet '{sheet_name}'")
+
+    def pieces():
+        nonlocal has_text
+        ext = get_file_extension(file_path)
+        if ext in SPREADSHEET_EXTENSIONS:
+            chunks = iter_spreadsheet_rows(file_path, SPREADSHEET_MAX_ROWS, SPREADSHEET_MAX_CELLS,
+                                           on_truncated=truncated)
+        elif ext == '.json':
+            chunks = (value + '\n' for value in iter_json_scalars(file_path))
+        else:
+            chunks = iter_text_chunks(file_path)
+        scanned = 0
+        for chunk in chunks:
+            cut = max_chars is not None and scanned + len(chunk) > max_chars
+            if cut:
+                result['over_budget'].append(f"only the first {max_chars} characters scanned")
+                chunk = chunk[:max_chars - scanned]
+            has_text = has_text or bool(chunk.strip())
+            scanned += len(chunk)
+            yield chunk
+            if cut:
+                break
+
+    try:
+        with stage('stream_scan'), stage_budget('stream_scan'):  # reading and scanning interleave
+            found = scan_chunks(pieces())
+    except Exception as e:
+        print(f"[ERROR] Failed to read file: {file_path}\n{e}")
+        result['error'] = str(e)
+        return result
+    if not has_text:
+        return result
+
+    _set_matches(result, found)
+    return result
+
+
+def result_to_row(result):
+    """Format a scanned or deferred result as an output CSV row (unique matches, sorted and joined)."""
+    row = [result['file_name']]
+    for category in CATEGORIES:
+        values = result['matches'][category] if result['matches'] else None
+        row.append("; ".join(sorted(set(values))) if values else "")
+    row.append(result['status'])
+    return row
+
+
+def open_csv_writer(csvfile):
+    csv_writer = csv.writer(csvfile)
+    csv_writer.writerow(CSV_COLUMNS)
+    return csv_writer
+
+
+def list_files(folder_path, recursive=False):
+    """Return the files in `folder_path`, optionally descending into subfolders."""
+    if not recursive:
+        return [os.path.join(folder_path, item) for item in sorted(os.listdir(folder_path))
+                if os.path.isfile(os.path.join(folder_path, item))]
+    files = []
+    for dir_path, dir_names, file_names in os.walk(folder_path):
+        dir_names.sort()
+        files.extend(os.path.join(dir_path, name) for name in sorted(file_names))
+    return files
+
+
+def expand_paths(paths, recursive=False):
+    """Expand folders in `paths` into the files they contain."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(list_files(path, recursive=recursive))
+        else:
+            files.append(path)
+    return files
+
+
+def scan_files(file_paths, workers=None):
+    """Yield process_single_file results for `file_paths` in completion order.
+
+    Files are spread over `workers` processes (default: all cores); files that crashed
+    the scanner are left out.
+    """
+    for index, file_path, result in run_batch(process_single_file, file_paths, workers=workers,
+                                              gpu=OCR_GPU):
+        if result is not None:
+            yield result
+
+
+def scan_to_csv(file_paths, out_path, workers=None, on_result=None, incremental=False, cancel=None,
+                metrics=True, metrics_path=None, profile_dir=None, index_path=None):
+    """Scan `file_paths` and write the CSV summary to `out_path`; returns the number of files scanned.
+
+    `on_result` sees each result as soon as it completes, while CSV rows are written in
+    the order of `file_paths` so reruns produce identical files. With `incremental`, a
+    manifest next to `out_path` records what was already scanned: only new or changed
+    files are scanned and the rows of unchanged files are carried over. Setting the
+    `cancel` event stops the scan early, keeping the rows written so far.
+
+    Per-file stage timings, counters and memory go to the JSONL file `metrics_path`
+    (by default next to `out_path`) and a summary of the run is printed at the end,
+    unless `metrics` is False; `profile_dir` additionally leaves a cProfile .prof file
+    per scanned file there.
+
+    With `index_path`, every scanned file's matches, with their offsets, and its text are
+    also written to that results index (results_index.py); files left out of an
+    incremental run keep what earlier runs indexed.
+    """
+    file_paths = list(file_paths)
+    keys = [os.path.abspath(p) for p in file_paths]
+    results_db = ResultsIndex(index_path) if index_path else None
+    manifest = None
+    rescan = set(keys)
+    if incremental:
+        manifest = Manifest(out_path + MANIFEST_SUFFIX)
+        todo_keys, _, deleted = manifest.plan(dict(zip(keys, file_paths)))
+        for key in deleted:
+            manifest.remove(key)
+            if results_db:
+                results_db.remove(key)
+        rescan = set(todo_keys)
+
+    metrics_path = metrics_path or out_path + METRICS_SUFFIX
+    recorder = MetricsRecorder(metrics_path) if metrics or profile_dir else None
+    order = Reorder()
+    with open(out_path, mode='w', newline='', encoding='utf-8') as csvfile:
+        csv_writer = open_csv_writer(csvfile)
+
+        def write(rows):
+            with parent_stage(recorder, 'write'):
+                for row in rows:
+                    if row is not None:
+                        csv_writer.writerow(row)
+
+        todo = []
+        for index, key in enumerate(keys):
+            if key in rescan:
+                todo.append(index)
+            else:
+                row = manifest.entries[key]['result']
+                if row is not None and len(row) < len(CSV_COLUMNS):
+                    row = row + ['ok']  # recorded before the Status column existed
+                write(order.push(index, row))
+
+        func = partial(process_single_file, keep_text=True) if results_db else process_single_file
+        if manifest:
+            func = tracked(func)
+        if recorder:
+            func = measured(func, profile_dir)
+        try:
+            for n, file_path, result in run_batch(func, [file_paths[i] for i in todo], workers=workers,
+                                                  gpu=OCR_GPU, cancel=cancel):
+                index = todo[n]
+                if recorder and result is not None:
+                    result = recorder.add(result)
+                if manifest and result is not None:
+                    stamp, result = result, result['result']
+                if results_db and result is not None:
+                    with parent_stage(recorder, 'index'):
+                        results_db.add(keys[index], pii=result, text=result.pop('text', None))
+                row = result_to_row(result) if result is not None and result['status'] != 'skipped' else None
+                if manifest:
+                    if result is None or result['status'] == 'deferred':
+                        manifest.remove(keys[index])  # retry on the next run
+                    else:
+                        manifest.record(keys[index], stamp, row)
+                if result is not None and on_result:
+                    on_result(result)
+                write(order.push(index, row))
+        finally:
+            if results_db:
+                results_db.close()
+
+    if manifest:
+        manifest.save()
+    if recorder:
+        print(format_summary(recorder.close()))
+    return len(todo)
+
+
+def watch_to_csv(folder, out_path, workers=None, on_result=None, stop=None, debounce=DEBOUNCE_SECONDS):
+    """Scan every file that lands in `folder` (recursively) and append its row to `out_path`.
+
+    Runs until `stop` is set or the process is interrupted. Files already in `folder` are
+    scanned first, except those the manifest next to `out_path` shows as already scanned
+    by this or an earlier incremental run. A file that changes is scanned again and gets
+    a new row.
+    """
+    manifest = Manifest(out_path + MANIFEST_SUFFIX)
+    has_rows = os.path.exists(out_path) and os.path.getsize(out_path) > 0
+    last_save = time.monotonic()
+
+    with open(out_path, mode='a', newline='', encoding='utf-8') as csvfile:
+        csv_writer = csv.writer(csvfile) if has_rows else open_csv_writer(csvfile)
+
+        def skip(path):
+            return manifest.unchanged(os.path.abspath(path), path)
+
+        def write(path, result):
+            nonlocal last_save
+            key = os.path.abspath(path)
+            if result is None:
+                manifest.remove(key)
+                return
+            stamp, result = result, result['result']
+            row = result_to_row(result) if result['status'] != 'skipped' else None
+            if row is not None:
+                csv_writer.writerow(row)
+                csvfile.flush()
+            if result['status'] == 'deferred':
+                manifest.remove(key)  # scanned again on the next start
+            else:
+                manifest.record(key, stamp, row)
+            if time.monotonic() - last_save > 5:
+                manifest.checkpoint()
+                last_save = time.monotonic()
+            print(f"[{result['status'].upper()}] {path}")
+            if on_result:
+                on_result(result)
+
+        try:
+            watch_folder(folder, tracked(process_single_file), write, extensions=SCANNED_EXTENSIONS, skip=skip,
+                         workers=workers, gpu=OCR_GPU, stop=stop, debounce=debounce)
+        finally:
+            manifest.save()
+
+
+# ----------------------------- Command line -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pii_scan", description="Scan files for personal information.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="scan files and folders and write a CSV summary")
+    scan.add_argument("paths", nargs="+", metavar="PATH", help="files or folders to scan")
+    scan.add_argument("--out", default=OUTPUT_CSV, help=f"output CSV (default: {OUTPUT_CSV})")
+    scan.add_argument("--workers", type=int, default=None,
+                      help="number of worker processes (default: one per CPU core)")
+    scan.add_argument("--recursive", action="store_true", help="descend into subfolders")
+    scan.add_argument("--incremental", action="store_true",
+                      help="only scan files that are new or changed since the last run with this --out")
+    scan.add_argument("--no-cache", action="store_true", help="always re-extract, ignoring the extraction cache")
+    scan.add_argument("--ocr-tier", choices=list(OCR_TIERS), default=OCR_TIER,
+                      help=f"OCR speed/accuracy tier for scanned pages and images (default: {OCR_TIER})")
+    scan.add_argument("--max-rows", type=int, default=SPREADSHEET_MAX_ROWS,
+                      help=f"scan at most this many spreadsheet rows per workbook (default: {SPREADSHEET_MAX_ROWS})")
+    scan.add_argument("--max-cells", type=int, default=SPREADSHEET_MAX_CELLS,
+                      help=f"scan at most this many spreadsheet cells per workbook (default: {SPREADSHEET_MAX_CELLS})")
+    scan.add_argument("--metrics", metavar="JSONL", default=None,
+                      help=f"write per-file stage timings to this file (default: --out plus {METRICS_SUFFIX})")
+    scan.add_argument("--no-metrics", action="store_true",
+                      help="do not record stage timings or print the profiling report")
+    scan.add_argument("--profile", metavar="DIR", default=None,
+                      help="also run each file under cProfile and save the .prof files in DIR")
+    scan.add_argument("--index", metavar="DB", default=None,
+                      help="also write matches and text to this SQLite results index (see results_index.py)")
+    add_budget_arguments(scan)
+
+    args = parser.parse_args(argv)
+    if args.no_cache:
+        set_cache(None)
+    set_spreadsheet_limits(args.max_rows, args.max_cells)
+    set_ocr_tier(args.ocr_tier)
+    apply_budget_arguments(args)
+
+    file_paths = expand_paths(args.paths, recursive=args.recursive)
+
+    def report(result):
+        print(f"[{result['status'].upper()}] {result['path']}")
+
+    # The cache counts hits and misses over its lifetime; report this run's share
+    before = get_cache().stats() if get_cache() else None
+    total = scan_to_csv(file_paths, args.out, workers=args.workers, on_result=report,
+                        incremental=args.incremental, metrics=not args.no_metrics, metrics_path=args.metrics,
+                        profile_dir=args.profile,
+                        index_path=args.index)
+    print(f"[INFO] Scanned {total} files. Output saved to: {os.path.abspath(args.out)}")
+    if get_cache():
+        stats = get_cache().stats()
+        print(f"[INFO] Extraction cache: {stats['hits'] - before['hits']} hits, "
+              f"{stats['misses'] - before['misses']} misses this run, "
+              f"{stats['entries']} entries ({stats['bytes'] / 1024 / 1024:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
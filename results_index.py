@@ -0,0 +1,354 @@
+import argparse
+import json
+import os
+import pathlib
+import re
+import sqlite3
+import sys
+import time
+
+# ----------------------------- Results index -----------------------------
+# Runs of the PII scanner, lease analytics and ingest sweeps can also write their
+# results into one SQLite file, so questions like "which files contain this ID number"
+# or "leases with a deposit flag dated 2023" are answered by an indexed lookup instead
+# of a rescan. One row per document, keyed by its absolute path; each run replaces the
+# rows it produces for a file (a PII scan replaces its matches and leaves the lease
+# fields of the same file alone). The extracted text goes into an FTS5 table for
+# full-text search when the run passes it along.
+#
+# The database runs in WAL mode so queries are answered while a run is writing, and
+# inserts are committed in batches of BATCH_SIZE documents (or every COMMIT_SECONDS) to
+# keep the per-file cost low. Query it from Python with ResultsIndex or from the shell:
+#
+#     python results_index.py results.db pii 8001015009087
+#     python results_index.py results.db leases --flag deposit --year 2023
+#     python results_index.py results.db search "deposit NEAR escalation"
+
+SCHEMA_VERSION = 1
+BATCH_SIZE = 500
+COMMIT_SECONDS = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    file_name TEXT NOT NULL,
+    indexed_at REAL NOT NULL,
+    pii_status TEXT,
+    pii_error TEXT,
+    lease_status TEXT,
+    health_score INTEGER,
+    page_sources TEXT
+);
+CREATE TABLE IF NOT EXISTS pii_matches (
+    document_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    value TEXT NOT NULL,
+    start INTEGER,  -- character offsets into the extracted text, when known
+    "end" INTEGER
+);
+CREATE TABLE IF NOT EXISTS dates (
+    document_id INTEGER NOT NULL,
+    date TEXT NOT NULL  -- ISO yyyy-mm-dd
+);
+CREATE TABLE IF NOT EXISTS monetary_values (
+    document_id INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    amount REAL
+);
+CREATE TABLE IF NOT EXISTS clauses (
+    document_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    start INTEGER,
+    "end" INTEGER,
+    text TEXT
+);
+CREATE TABLE IF NOT EXISTS compliance_flags (
+    document_id INTEGER NOT NULL,
+    flag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pii_value ON pii_matches (value, category);
+CREATE INDEX IF NOT EXISTS pii_document ON pii_matches (document_id);
+CREATE INDEX IF NOT EXISTS date_value ON dates (date);
+CREATE INDEX IF NOT EXISTS date_document ON dates (document_id);
+CREATE INDEX IF NOT EXISTS money_document ON monetary_values (document_id);
+CREATE INDEX IF NOT EXISTS clause_document ON clauses (document_id, category);
+CREATE INDEX IF NOT EXISTS flag_value ON compliance_flags (flag);
+CREATE INDEX IF NOT EXISTS flag_document ON compliance_flags (document_id);
+"""
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS document_text USING fts5(text, tokenize='unicode61 remove_diacritics 2')"
+
+PII_TABLES = ('pii_matches',)
+LEASE_TABLES = ('dates', 'monetary_values', 'clauses', 'compliance_flags')
+
+
+def _amount(value):
+    """The number in a matched monetary value ('R12,500.00' -> 12500.0), or None."""
+    digits = re.sub(r'[^\d.]', '', value)
+    try:
+        return float(digits)
+    except ValueError:
+        return None
+
+
+class ResultsIndex:
+    """A SQLite index of scan and lease results; see the section comment above.
+
+    Writes are batched: call close() (or use it as a context manager) so the last batch
+    is committed. Reading methods see everything added so far. With `read_only` the file
+    is opened read-only and left exactly as it is, which is how the command line opens it.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE, read_only=False):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.read_only = read_only
+        self._pending = 0
+        self._batch_started = None
+        if read_only:
+            uri = pathlib.Path(self.path).resolve().as_uri() + "?mode=ro"
+            self._db = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False)
+            version = self._db.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                raise ValueError(f"{self.path} is not a results index of version {SCHEMA_VERSION}.")
+            self.full_text = self._db.execute("SELECT 1 FROM sqlite_master WHERE name = 'document_text'"
+                                              ).fetchone() is not None
+            return
+        self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # durable at each checkpoint, enough for an index
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise ValueError(f"{self.path} is a results index of version {version}; "
+                             f"this version reads {SCHEMA_VERSION}. Delete it to rebuild.")
+        self._db.executescript(SCHEMA)
+        try:
+            self._db.execute(FTS_SCHEMA)
+            self.full_text = True
+        except sqlite3.OperationalError:
+            print("[INFO] This SQLite build has no FTS5; the results index will not support text search.")
+            self.full_text = False
+        self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # --- writing ---
+    def _begin(self):
+        if self._batch_started is None:
+            self._db.execute("BEGIN")
+            self._batch_started = time.monotonic()
+
+    def _added(self):
+        self._pending += 1
+        if self._pending >= self.batch_size or time.monotonic() - self._batch_started >= COMMIT_SECONDS:
+            self.commit()
+
+    def commit(self):
+        """Commit the current batch."""
+        if self._batch_started is not None:
+            self._db.execute("COMMIT")
+        self._pending = 0
+        self._batch_started = None
+
+    def _document_id(self, path):
+        path = os.path.abspath(str(path))
+        self._db.execute("INSERT OR IGNORE INTO documents (path, file_name, indexed_at) VALUES (?, ?, ?)",
+                         (path, os.path.basename(path), time.time()))
+        document_id = self._db.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()[0]
+        self._db.execute("UPDATE documents SET indexed_at = ? WHERE id = ?", (time.time(), document_id))
+        return document_id
+
+    def _clear(self, document_id, tables):
+        for table in tables:
+            self._db.execute(f"DELETE FROM {table} WHERE document_id = ?", (document_id,))
+
+    def add(self, path, pii=None, lease=None, text=None):
+        """Index the results of one file, replacing what earlier runs indexed for it.
+
+        `pii` is a pii_scan.process_single_file() result, `lease` a lease_analytics
+        process_file() record and `text` the extracted text; each is optional and only
+        the parts given are replaced. Deferred results are left out: the file keeps what
+        was indexed before until the run that retries it.
+        """
+        pii = None if pii is not None and pii['status'] == 'deferred' else pii
+        lease = None if lease is not None and lease.get('status') == 'deferred' else lease
+        if pii is None and lease is None and text is None:
+            return
+        self._begin()
+        document_id = self._document_id(path)
+        if pii is not None:
+            self._add_pii(document_id, pii)
+        if lease is not None:
+            self._add_lease(document_id, lease)
+        if text is not None and self.full_text:
+            self._db.execute("DELETE FROM document_text WHERE rowid = ?", (document_id,))
+            self._db.execute("INSERT INTO document_text (rowid, text) VALUES (?, ?)", (document_id, text))
+        self._added()
+
+    def _add_pii(self, document_id, result):
+        self._db.execute("UPDATE documents SET pii_status = ?, pii_error = ? WHERE id = ?",
+                         (result['status'], result.get('error'), document_id))
+        self._clear(document_id, PII_TABLES)
+        if result.get('spans') is not None:
+            rows = [(document_id, category, value, start, end) for category, start, end, value in result['spans']]
+        else:  # no offsets, e.g. a result from before spans were recorded
+            rows = [(document_id, category, value, None, None)
+                    for category, values in (result.get('matches') or {}).items() for value in values]
+        self._db.executemany('INSERT INTO pii_matches (document_id, category, value, start, "end") '
+                             'VALUES (?, ?, ?, ?, ?)', rows)
+
+    def _add_lease(self, document_id, record):
+        self._db.execute("UPDATE documents SET lease_status = ?, health_score = ?, page_sources = ? WHERE id = ?",
+                         (record.get('status', 'ok'), record.get('health_score'),
+                          json.dumps(record.get('page_sources') or []), document_id))
+        self._clear(document_id, LEASE_TABLES)
+        db = self._db
+        db.executemany("INSERT INTO dates (document_id, date) VALUES (?, ?)",
+                       [(document_id, date) for date in record.get('dates') or []])
+        db.executemany("INSERT INTO monetary_values (document_id, value, amount) VALUES (?, ?, ?)",
+                       [(document_id, value.strip(), _amount(value)) for value in record.get('monetary_values') or []])
+        spans = record.get('clause_spans') or {}
+        db.executemany('INSERT INTO clauses (document_id, category, start, "end", text) VALUES (?, ?, ?, ?, ?)',
+                       [(document_id, category, start, end, text)
+                        for category, texts in (record.get('clauses') or {}).items()
+                        for (start, end), text in zip(spans.get(category) or [(None, None)] * len(texts), texts)])
+        db.executemany("INSERT INTO compliance_flags (document_id, flag) VALUES (?, ?)",
+                       [(document_id, flag) for flag in record.get('compliance_flags') or []])
+
+    def remove(self, path):
+        """Drop a file (e.g. one deleted since the last run) from the index."""
+        row = self._db.execute("SELECT id FROM documents WHERE path = ?", (os.path.abspath(str(path)),)).fetchone()
+        if row is None:
+            return
+        self._begin()
+        self._clear(row[0], PII_TABLES + LEASE_TABLES)
+        if self.full_text:
+            self._db.execute("DELETE FROM document_text WHERE rowid = ?", (row[0],))
+        self._db.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+        self._added()
+
+    def close(self):
+        if not self.read_only:
+            self.commit()
+            self._db.execute("PRAGMA optimize")
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- querying ---
+    def query(self, sql, params=()) -> list:
+        """Rows of any SELECT over the tables of SCHEMA, as dicts."""
+        cursor = self._db.execute(sql, params)
+        if cursor.description is None:  # a statement without a result set, e.g. a PRAGMA assignment
+            return []
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def find_pii(self, value, category=None, limit=100) -> list:
+        """Files containing PII `value` (an ID number is matched without separators)."""
+        if category in (None, "ID Number"):
+            value = re.sub(r'[\s-]', '', value) if re.fullmatch(r'[\d\s-]+', value) else value
+        sql = ('SELECT d.path, m.category, m.value, m.start, m."end" FROM pii_matches m '
+               'JOIN documents d ON d.id = m.document_id WHERE m.value = ?')
+        params = [value]
+        if category:
+            sql += " AND m.category = ?"
+            params.append(category)
+        return self.query(sql + " ORDER BY d.path, m.start LIMIT ?", params + [limit])
+
+    def find_leases(self, flag=None, year=None, clause=None, max_health=None, limit=100) -> list:
+        """Leases with a compliance flag containing `flag`, a date in `year`, a clause of
+        category `clause` and/or a health score of at most `max_health`."""
+        where, params = [], []
+        if flag:
+            where.append("EXISTS (SELECT 1 FROM compliance_flags f WHERE f.document_id = d.id AND f.flag LIKE ?)")
+            params.append(f"%{flag}%")
+        if year:
+            where.append("EXISTS (SELECT 1 FROM dates t WHERE t.document_id = d.id AND t.date >= ? AND t.date < ?)")
+            params += [f"{int(year):04d}", f"{int(year) + 1:04d}"]
+        if clause:
+            where.append("EXISTS (SELECT 1 FROM clauses c WHERE c.document_id = d.id AND c.category = ?)")
+            params.append(clause)
+        if max_health is not None:
+            where.append("d.health_score <= ?")
+            params.append(max_health)
+        sql = ("SELECT d.path, d.health_score, d.lease_status, "
+               "(SELECT group_concat(flag, '; ') FROM compliance_flags f WHERE f.document_id = d.id) AS flags "
+               "FROM documents d WHERE d.lease_status IS NOT NULL")
+        sql += "".join(f" AND {condition}" for condition in where)
+        return self.query(sql + " ORDER BY d.path LIMIT ?", params + [limit])
+
+    def search(self, query, limit=20) -> list:
+        """Files whose text matches an FTS5 query, best match first, with a snippet."""
+        if not self.full_text:
+            raise RuntimeError("This SQLite build has no FTS5; text search is not available.")
+        return self.query("SELECT d.path, snippet(document_text, 0, '[', ']', '...', 12) AS snippet "
+                          "FROM document_text JOIN documents d ON d.id = document_text.rowid "
+                          "WHERE document_text MATCH ? ORDER BY rank LIMIT ?", (query, limit))
+
+    def stats(self) -> dict:
+        tables = ('documents',) + PII_TABLES + LEASE_TABLES + (('document_text',) if self.full_text else ())
+        return {table: self._db.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for table in tables}
+
+
+# ----------------------------- Command line -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="results_index", description="Query a results index.")
+    parser.add_argument("index", help="the SQLite file written with --index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pii = commands.add_parser("pii", help="files containing a PII value")
+    pii.add_argument("value")
+    pii.add_argument("--category", help='only matches of this category, e.g. "ID Number"')
+    leases = commands.add_parser("leases", help="leases by compliance flag, date, clause or health score")
+    leases.add_argument("--flag", help="compliance flags containing this text, e.g. deposit")
+    leases.add_argument("--year", type=int, help="with a date in this year")
+    leases.add_argument("--clause", help="with a clause of this category, e.g. governing_law")
+    leases.add_argument("--max-health", type=int, help="health score at most this")
+    search = commands.add_parser("search", help="full-text search of the extracted text (FTS5 query syntax)")
+    search.add_argument("query")
+    sql = commands.add_parser("sql", help="run a SELECT statement (the index is opened read-only)")
+    sql.add_argument("statement")
+    commands.add_parser("stats", help="row counts")
+    for command in (pii, leases, search, sql):
+        command.add_argument("--limit", type=int, default=100, help="at most this many rows (default: 100)")
+
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.index):
+        parser.error(f"no results index at {args.index}")
+    try:
+        index = ResultsIndex(args.index, read_only=True)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"[ERROR] {e}")
+        return 1
+    t0 = time.perf_counter()
+    try:
+        if args.command == "pii":
+            rows = index.find_pii(args.value, category=args.category, limit=args.limit)
+        elif args.command == "leases":
+            rows = index.find_leases(flag=args.flag, year=args.year, clause=args.clause,
+                                     max_health=args.max_health, limit=args.limit)
+        elif args.command == "search":
+            rows = index.search(args.query, limit=args.limit)
+        elif args.command == "sql":
+            rows = index.query(args.statement)[:args.limit]
+        else:
+            rows = [index.stats()]
+    except (sqlite3.Error, RuntimeError) as e:
+        print(f"[ERROR] {e}")
+        return 1
+    finally:
+        index.close()
+    elapsed = (time.perf_counter() - t0) * 1000
+    if rows:
+        print("\t".join(rows[0]))
+    for row in rows:
+        print("\t".join("" if value is None else str(value) for value in row.values()))
+    print(f"[INFO] {len(rows)} rows in {elapsed:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
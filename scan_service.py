@@ -0,0 +1,294 @@
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import lease_analytics
+import pii_scan
+from batch import default_workers, open_pool, replace_pool
+from budgets import add_budget_arguments, apply_budget_arguments
+
+# ----------------------------- Local scanning service -----------------------------
+# A long-running process that keeps a pool of warm workers (modules imported, OCR
+# reader loaded) and accepts files over HTTP, on a TCP port or a Unix socket. Results
+# stream back as newline-delimited JSON as each file finishes, so a text PDF costs
+# milliseconds instead of a cold start.
+#
+#   python scan_service.py --port 8765
+#   curl -s localhost:8765/scan/pii -d '{"paths": ["/data/in/a.pdf", "/data/in/b.docx"]}'
+#   curl -s localhost:8765/stats
+#
+#   python scan_service.py --socket /tmp/scan.sock
+#   curl -s --unix-socket /tmp/scan.sock http://localhost/scan/lease -d '{"path": "/data/lease.pdf"}'
+
+DEFAULT_PORT = 8765
+MAX_QUEUE = 1000  # files accepted but not finished; further requests get 503
+LATENCY_WINDOW = 1000  # latency percentiles cover this many most recent files
+
+
+def _lease(path):
+    return lease_analytics.process_file(Path(path))
+
+
+TASKS = {
+    'pii': (pii_scan.process_single_file, pii_scan.OCR_LANGUAGES, pii_scan.OCR_GPU),
+    'lease': (_lease, lease_analytics.OCR_LANGUAGES, lease_analytics.OCR_GPU),
+}
+
+
+def _run(task, path):
+    """Worker side: run `task` on `path` and time it."""
+    t0 = time.perf_counter()
+    result = TASKS[task][0](path)
+    return result, time.perf_counter() - t0
+
+
+def _ping():
+    time.sleep(0.2)  # long enough that each ping lands on a different worker
+    return os.getpid()
+
+
+class QueueFull(Exception):
+    pass
+
+
+class ScanService:
+    """A warm process pool plus the bookkeeping behind /stats."""
+
+    def __init__(self, workers=None, preload=None, max_queue=MAX_QUEUE):
+        self.workers = workers or default_workers()
+        self.max_queue = max_queue
+        self.languages, self.gpu = (TASKS[preload][1], TASKS[preload][2]) if preload else (None, False)
+        self.pool = open_pool(self.workers, preload_ocr=self.languages, gpu=self.gpu)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.pool_restarts = 0
+        self.counts = {task: {'completed': 0, 'failed': 0} for task in TASKS}
+        self.latencies = {task: deque(maxlen=LATENCY_WINDOW) for task in TASKS}  # (total_s, service_s)
+
+    def warm_up(self):
+        """Start every worker now, so their start-up and model loading is not paid by the first request."""
+        pids = {future.result() for future in [self.pool.submit(_ping) for _ in range(self.workers)]}
+        print(f"[INFO] {len(pids)} workers ready")
+
+    def submit(self, task, paths):
+        """Queue `paths` for `task`; returns {future: (index, path, submitted_at, pool)}."""
+        with self._lock:
+            if self.pending + len(paths) > self.max_queue:
+                raise QueueFull(f"Queue is full ({self.pending} files pending, limit {self.max_queue})")
+            self.pending += len(paths)
+        now = time.perf_counter()
+        futures = {}
+        for index, path in enumerate(paths):
+            future, pool = self._submit(_run, task, path)
+            futures[future] = (index, path, now, pool)
+        return futures
+
+    def _submit(self, *args):
+        """(future, the pool it runs on); a pool found broken is replaced first."""
+        pool = self.pool
+        try:
+            return pool.submit(*args), pool
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            pool = self.pool
+            return pool.submit(*args), pool
+
+    def _replace_pool(self, broken):
+        """Swap a pool broken by a dead worker for a fresh one, once however many requests notice."""
+        with self._lock:
+            if self.pool is broken:
+                self.pool = replace_pool(broken, self.workers, preload_ocr=self.languages, gpu=self.gpu)
+                self.pool_restarts += 1
+
+    def results(self, task, futures):
+        """Yield one response record per future, in completion order."""
+        remaining = dict(futures)
+        try:
+            while remaining:
+                done, _ = wait(remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, path, submitted, pool = remaining.pop(future)
+                    yield self._finish(task, future, index, path, submitted, pool)
+        finally:
+            # The client went away: drop what has not started yet
+            for future in remaining:
+                future.cancel()
+            with self._lock:
+                self.pending -= len(remaining)
+
+    def _finish(self, task, future, index, path, submitted, pool):
+        total = time.perf_counter() - submitted
+        record = {'index': index, 'path': path, 'latency_ms': round(total * 1000, 1)}
+        try:
+            result, service = future.result()
+            record.update(ok=True, result=result, service_ms=round(service * 1000, 1))
+        except BrokenProcessPool as e:
+            # Every file in flight on the pool fails with the worker that died
+            service = None
+            record.update(ok=False, error=f"Worker process died: {e}")
+            self._replace_pool(pool)
+        except Exception as e:
+            service = None
+            record.update(ok=False, error=str(e))
+        with self._lock:
+            self.pending -= 1
+            self.counts[task]['completed' if record['ok'] else 'failed'] += 1
+            if service is not None:
+                self.latencies[task].append((total, service))
+        return record
+
+    def stats(self) -> dict:
+        with self._lock:
+            tasks = {}
+            for task in TASKS:
+                latencies = sorted(total for total, _ in self.latencies[task])
+                services = sorted(service for _, service in self.latencies[task])
+                tasks[task] = dict(self.counts[task],
+                                   latency_ms=_percentiles(latencies), service_ms=_percentiles(services))
+            return {
+                'uptime_s': round(time.time() - self.started, 1),
+                'workers': self.workers,
+                'queue_depth': self.pending,
+                'pool_restarts': self.pool_restarts,
+                'max_queue': self.max_queue,
+                'tasks': tasks,
+            }
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {}
+    pick = lambda q: round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1)  # noqa: E731
+    return {'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99), 'max': round(values[-1] * 1000, 1)}
+
+
+class ScanHandler(BaseHTTPRequestHandler):
+    # The ScanService is on self.server.service
+
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send_json(200, self.server.service.stats())
+        elif self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': f'Unknown path {self.path}'})
+
+    def do_POST(self):
+        task = self.path.rstrip('/').rsplit('/', 1)[-1] if self.path.startswith('/scan/') else None
+        if task not in TASKS:
+            self._send_json(404, {'error': f"POST to /scan/<task>, where task is one of {', '.join(TASKS)}"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            paths = body['paths'] if 'paths' in body else [body['path']]
+            if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+                raise ValueError("'paths' must be a list of file paths")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {'error': f"Expected a JSON body with 'path' or 'paths': {e}"})
+            return
+
+        missing = [p for p in paths if not os.path.isfile(p)]
+        if missing:
+            self._send_json(400, {'error': 'Files not found', 'paths': missing})
+            return
+        try:
+            futures = self.server.service.submit(task, paths)
+        except QueueFull as e:
+            self._send_json(503, {'error': str(e)})
+            return
+
+        # Streamed without a Content-Length; the connection closes after the last line
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        results = self.server.service.results(task, futures)
+        try:
+            for record in results:
+                self.wfile.write((json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            results.close()
+
+    def log_message(self, format, *args):
+        print(f"[INFO] {self.address_string()} {format % args}")
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+        self.server_name, self.server_port = 'localhost', 0
+
+
+def serve(service, host='127.0.0.1', port=DEFAULT_PORT, socket_path=None):
+    """Serve `service` until interrupted."""
+    if socket_path:
+        server = UnixHTTPServer(socket_path, ScanHandler)
+        where = socket_path
+    else:
+        server = ThreadingHTTPServer((host, port), ScanHandler)
+        where = f"http://{host}:{server.server_port}"
+    server.service = service
+    print(f"[INFO] Scan service listening on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="scan_service", description="Serve PII and lease scans from warm workers.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default: {DEFAULT_PORT})")
+    parser.add_argument("--socket", help="listen on this Unix socket instead of a TCP port")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: one per CPU core)")
+    parser.add_argument("--preload", choices=list(TASKS), default=None,
+                        help="load this task's OCR reader in every worker at start-up")
+    parser.add_argument("--max-queue", type=int, default=MAX_QUEUE,
+                        help=f"files accepted but not finished before requests are refused (default: {MAX_QUEUE})")
+    add_budget_arguments(parser)
+    args = parser.parse_args(argv)
+    apply_budget_arguments(args)
+
+    service = ScanService(workers=args.workers, preload=args.preload, max_queue=args.max_queue)
+    service.warm_up()
+    serve(service, host=args.host, port=args.port, socket_path=args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
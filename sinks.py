@@ -0,0 +1,155 @@
+import csv
+import glob
+import json
+import os
+
+# ----------------------------- Streaming result sinks -----------------------------
+# Results are appended to their output files as they complete instead of being
+# collected in memory and written at the end. Every record is flushed when it is
+# written, so a crash leaves everything written before it usable, and a JSONL file
+# cut off mid-line is repaired the next time it is opened for appending.
+
+
+def _cell(value):
+    """Flatten a value for CSV/Parquet: lists and dicts become JSON strings."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _drop_torn_line(path):
+    """Truncate `path` after its last complete line (a crash can leave half a record)."""
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return
+        # Walk back to the previous newline
+        pos = size - 1
+        while pos > 0:
+            step = min(64 * 1024, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                f.truncate(pos - step + newline + 1)
+                return
+            pos -= step
+        f.truncate(0)  # not even one complete line
+        f.truncate(0)
+
+
+def read_jsonl(path):
+    """Yield the records of a JSONL file, skipping lines that are not complete JSON."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def filter_jsonl(path, keep):
+    """Rewrite a JSONL file in place, one record at a time, keeping records where keep(record)."""
+    if not os.path.exists(path):
+        return 0
+    kept = 0
+    tmp_path = str(path) + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        for record in read_jsonl(path):
+            if keep(record):
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                kept += 1
+    os.replace(tmp_path, path)
+    return kept
+
+
+class JsonlSink:
+    """One JSON object per line; the full record, nested fields included."""
+
+    def __init__(self, path, append=False):
+        self.path = str(path)
+        if append and os.path.exists(self.path):
+            _drop_torn_line(self.path)
+        self._file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CsvSink:
+    """A CSV with a fixed set of columns; nested values are written as JSON."""
+
+    def __init__(self, path, columns, append=False):
+        self.path = str(path)
+        self.columns = list(columns)
+        has_rows = append and os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        self._file = open(self.path, 'a' if has_rows else 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        if not has_rows:
+            self._writer.writerow(self.columns)
+
+    def write(self, record):
+        self._writer.writerow([_cell(record.get(column)) for column in self.columns])
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """A Parquet dataset directory written one row group per part file.
+
+    Each part is complete and readable as soon as it is written, so a crash loses at most
+    the rows still buffered. Read it back with pandas.read_parquet(directory). Needs pyarrow.
+
+    Every part is written with the same schema, so the parts always merge: columns are
+    strings unless `types` maps them to a pyarrow type alias such as 'int64'.
+    """
+
+    def __init__(self, directory, columns, row_group_size=1000, append=False, types=None):
+        import pyarrow
+        import pyarrow.parquet
+
+        self._pa, self._pq = pyarrow, pyarrow.parquet
+        self.directory = str(directory)
+        self.columns = list(columns)
+        types = types or {}
+        self.schema = pyarrow.schema([(column, pyarrow.type_for_alias(types.get(column, 'string')))
+                                      for column in self.columns])
+        self.row_group_size = row_group_size
+        os.makedirs(self.directory, exist_ok=True)
+        parts = sorted(glob.glob(os.path.join(self.directory, 'part-*.parquet')))
+        if not append:
+            for part in parts:
+                os.remove(part)
+            parts = []
+        self._next_part = len(parts)
+        self._rows = []
+
+    def write(self, record):
+        self._rows.append({column: _cell(record.get(column)) for column in self.columns})
+        if len(self._rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        table = self._pa.Table.from_pylist(self._rows, schema=self.schema)
+        part_path = os.path.join(self.directory, f'part-{self._next_part:05d}.parquet')
+        self._pq.write_table(table, part_path + '.tmp', row_group_size=self.row_group_size)
+        os.replace(part_path + '.tmp', part_path)
+        self._next_part += 1
+        self._rows = []
+
+    def close(self):
+        self.flush()
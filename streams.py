@@ -0,0 +1,183 @@
+import json
+import re
+
+try:
+    import ijson  # optional incremental JSON parser with a C backend
+except ImportError:
+    ijson = None
+
+# ----------------------------- Streaming readers -----------------------------
+# Readers for inputs too large to hold in memory as one string. Each yields the text of
+# a file as a sequence of pieces, reading a bounded amount at a time, so a multi-GB log
+# or data export can be scanned without ever building its full text.
+
+READ_CHUNK_CHARS = 1024 * 1024
+
+# One JSON token: a string, a number, a literal or a structural character
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null|[{}\[\]:,]|\s+')
+_JSON_SCALAR_START = set('"-0123456789tfn')
+_JSON_TOKEN_MARGIN = 64
+# The inside of a string up to its closing quote, an unfinished escape or the end of the text
+_JSON_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*', re.S)
+
+
+def iter_text_chunks(path, chunk_chars=READ_CHUNK_CHARS, encoding='utf-8', errors='strict'):
+    """Yield the text of `path` in pieces of at most `chunk_chars` characters.
+
+    Decoding is incremental, so a multi-byte character split across two reads is
+    decoded whole.
+    """
+    with open(path, 'r', encoding=encoding, errors=errors) as f:
+        for chunk in iter(lambda: f.read(chunk_chars), ''):
+            yield chunk
+
+
+def _scalar_text(value):
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def iter_json_scalars(path, chunk_chars=READ_CHUNK_CHARS):
+    """Yield every key and scalar value of the JSON document at `path` as text.
+
+    The document is walked token by token instead of being loaded, so memory stays
+    bounded by the longest single string in it. Strings are yielded decoded. Uses ijson
+    when it is installed, otherwise a regex tokenizer; raises ValueError on malformed input.
+    """
+    if ijson is not None:
+        with open(path, 'rb') as f:
+            for _, event, value in ijson.parse(f):
+                if event == 'map_key' or event in ('string', 'number', 'boolean', 'null'):
+                    yield _scalar_text(value)
+        return
+
+    buffer = ''
+    pieces = None  # a string longer than the buffer, until its closing quote is read
+    escaped = False
+    for chunk in iter_text_chunks(path, chunk_chars):
+        if pieces is not None:
+            end, escaped = _json_string_end(chunk, 0, escaped)
+            if end is None:
+                pieces.append(chunk)
+                continue
+            pieces.append(chunk[:end])
+            yield json.loads(''.join(pieces))
+            pieces = None
+            chunk = chunk[end:]
+        buffer += chunk
+        pos = 0
+        while True:
+            m = _JSON_TOKEN.match(buffer, pos)
+            # A number or literal near the end of the buffer may continue in the next
+            # chunk; a string is complete once its closing quote is in
+            if m is None or (buffer[pos] != '"' and m.end() > len(buffer) - _JSON_TOKEN_MARGIN):
+                break
+            yield from _json_token_text(m.group(0))
+            pos = m.end()
+        if m is None and pos < len(buffer) and buffer[pos] == '"':
+            # Only the chunks read from now on are searched for its closing quote,
+            # rather than the whole string again with every chunk
+            _, escaped = _json_string_end(buffer, pos + 1, False)
+            pieces, buffer = [buffer[pos:]], ''
+            continue
+        if m is None and pos < len(buffer) and buffer[pos] not in _JSON_SCALAR_START:
+            raise ValueError(f"Invalid JSON at character {pos} of the current chunk: {buffer[pos:pos + 20]!r}")
+        buffer = buffer[pos:]
+
+    if pieces is not None:
+        raise ValueError("Invalid JSON: a string is not closed before the end of the document")
+    pos = 0
+    while pos < len(buffer):
+        m = _JSON_TOKEN.match(buffer, pos)
+        if m is None:
+            raise ValueError(f"Invalid JSON near the end of the document: {buffer[pos:pos + 20]!r}")
+        yield from _json_token_text(m.group(0))
+        pos = m.end()
+
+
+def _json_string_end(text, start, escaped):
+    """(index just past the closing quote or None, whether `text` ends inside an escape),
+    scanning the inside of a string from `start`; `escaped` when the previous piece did."""
+    if escaped:
+        start += 1
+    end = _JSON_STRING_BODY.match(text, start).end()
+    if end < len(text) and text[end] == '"':
+        return end + 1, False
+    return None, end < len(text)  # stopped at a backslash that is the last character
+
+
+def _json_token_text(token):
+    first = token[0]
+    if first == '"':
+        yield json.loads(token)
+    elif first in _JSON_SCALAR_START:
+        yield token
+
+
+def _cell_text(value):
+    # Spreadsheets store numbers as floats; an ID number must not come out as 8001015009087.0
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _xlsx_rows(path):
+    import openpyxl
+
+    # read_only parses each sheet as it is iterated instead of building it in memory
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            for row in sheet.iter_rows(values_only=True):
+                yield sheet.title, row
+    finally:
+        workbook.close()
+
+
+def _xls_rows(path):
+    import xlrd
+
+    # on_demand loads one sheet at a time
+    book = xlrd.open_workbook(path, on_demand=True)
+    try:
+        for index in range(book.nsheets):
+            sheet = book.sheet_by_index(index)
+            for row in range(sheet.nrows):
+                yield sheet.name, sheet.row_values(row)
+            book.unload_sheet(index)
+    finally:
+        book.release_resources()
+
+
+def iter_spreadsheet_rows(path, max_rows=None, max_cells=None, on_truncated=None):
+    """Yield the rows of every sheet of an .xlsx or .xls workbook as text, one line per row.
+
+    Non-empty cells are joined with tabs, and each sheet with any content starts with a
+    '--- Sheet: name ---' line. Reading stops after `max_rows` rows or `max_cells`
+    non-empty cells in total (None for no limit), calling `on_truncated` with the sheet
+    it stopped in. Needs openpyxl for .xlsx and xlrd for .xls.
+    """
+    rows = _xls_rows(path) if str(path).lower().endswith('.xls') else _xlsx_rows(path)
+    current_sheet = None
+    row_count = cell_count = 0
+    try:
+        for sheet_name, row in rows:
+            cells = [_cell_text(value) for value in row if value is not None and value != '']
+            if not cells:
+                continue
+            if (max_rows is not None and row_count >= max_rows) or \
+                    (max_cells is not None and cell_count + len(cells) > max_cells):
+                if on_truncated is not None:
+                    on_truncated(sheet_name)
+                return
+            if sheet_name != current_sheet:
+                current_sheet = sheet_name
+                yield f'--- Sheet: {sheet_name} ---\n'
+            row_count += 1
+            cell_count += len(cells)
+            yield '\t'.join(cells) + '\n'
+    finally:
+        rows.close()
@@ -0,0 +1,174 @@
+import queue
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk
+
+# ----------------------------- Tk helpers shared by both tools -----------------------------
+# Tk must only be touched from the main thread. Work runs on a background thread that
+# posts messages to a queue; the main loop drains the queue on a timer and applies the
+# messages in batches, so the window stays responsive however fast results arrive.
+
+
+class BackgroundJob:
+    """Run `target(post, cancel)` on a worker thread and hand its messages to the Tk loop.
+
+    `target` calls post(kind, payload) from the worker thread and should return early once
+    the `cancel` event is set. `on_messages` is called on the main thread with a list of
+    (kind, payload) tuples, at most `batch` at a time, every `interval_ms`. A final
+    ('finished', None) message is posted after `target` returns, and ('error', message)
+    before it if `target` raised.
+    """
+
+    def __init__(self, root, target, on_messages, interval_ms=100, batch=1000):
+        self.root = root
+        self.target = target
+        self.on_messages = on_messages
+        self.interval_ms = interval_ms
+        self.batch = batch
+        self.cancel_event = threading.Event()
+        self._queue = queue.Queue()
+        self._thread = None
+        self.running = False
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.root.after(self.interval_ms, self._poll)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _run(self):
+        try:
+            self.target(self._post, self.cancel_event)
+        except Exception as e:
+            self._post('error', str(e))
+        finally:
+            self._post('finished', None)
+
+    def _post(self, kind, payload=None):
+        self._queue.put((kind, payload))
+
+    def _poll(self):
+        messages = []
+        try:
+            while len(messages) < self.batch:
+                messages.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        if messages:
+            self.on_messages(messages)
+        if any(kind == 'finished' for kind, _ in messages):
+            self.running = False
+        else:
+            self.root.after(self.interval_ms, self._poll)
+
+
+class ProgressMeter:
+    """Progress bar plus a 'done/total, rate, ETA' label."""
+
+    def __init__(self, parent):
+        self.frame = tk.Frame(parent)
+        self.bar = ttk.Progressbar(self.frame, orient="horizontal", mode="determinate", length=400)
+        self.bar.pack(side=tk.LEFT, padx=5)
+        self.label = tk.Label(self.frame, text="", width=40, anchor=tk.W)
+        self.label.pack(side=tk.LEFT)
+        self.total = 0
+        self.done = 0
+        self.started = None
+
+    def start(self, total):
+        self.total, self.done, self.started = total, 0, time.monotonic()
+        self.bar.configure(maximum=max(total, 1), value=0)
+        self.update(0)
+
+    def update(self, done):
+        self.done = done
+        self.bar.configure(value=done)
+        elapsed = time.monotonic() - self.started if self.started else 0
+        rate = done / elapsed if elapsed > 0 else 0
+        text = f"{done}/{self.total} files"
+        if rate:
+            eta = (self.total - done) / rate
+            text += f"  {rate:.1f} files/s  ETA {int(eta // 60)}:{int(eta % 60):02d}"
+        self.label.config(text=text)
+
+
+class VirtualTable:
+    """A Treeview that only ever holds the rows on screen.
+
+    Rows live in a plain list and the visible window is redrawn from it on scroll, so
+    appending 100k rows costs no more Tk work than appending a screenful.
+    """
+
+    def __init__(self, parent, columns, height=15, width=90, anchor=tk.CENTER):
+        self.frame = tk.Frame(parent)
+        self.rows = []
+        self.offset = 0
+        self.height = height
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings", height=height)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=width, anchor=anchor)
+        self.scroll_y = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        self.scroll_x = ttk.Scrollbar(self.frame, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.scroll_x.set)
+        self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._items = [self.tree.insert("", tk.END, values=()) for _ in range(height)]
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_wheel)
+        self._redraw()
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def clear(self):
+        self.rows = []
+        self.offset = 0
+        self._redraw()
+
+    def set_rows(self, rows):
+        self.rows = list(rows)
+        self.offset = 0
+        self._redraw()
+
+    def append_rows(self, rows):
+        # Keep following the end of the table if it was showing the last rows
+        at_end = self.offset + self.height >= len(self.rows)
+        self.rows.extend(rows)
+        if at_end:
+            self.offset = max(0, len(self.rows) - self.height)
+        self._redraw()
+
+    def _scroll_to(self, offset):
+        self.offset = max(0, min(int(offset), len(self.rows) - self.height))
+        self._redraw()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(float(amount) * len(self.rows))
+        elif action == "scroll":
+            step = self.height if unit == "pages" else 1
+            self._scroll_to(self.offset + int(amount) * step)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self.offset - 3)
+        else:
+            self._scroll_to(self.offset + 3)
+        return "break"
+
+    def _redraw(self):
+        visible = self.rows[self.offset:self.offset + self.height]
+        for i, item in enumerate(self._items):
+            self.tree.item(item, values=visible[i] if i < len(visible) else ())
+        if self.rows:
+            first = self.offset / len(self.rows)
+            last = min(1.0, (self.offset + self.height) / len(self.rows))
+        else:
+            first, last = 0.0, 1.0
+        self.scroll_y.set(first, last)
@@ -0,0 +1,296 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from queue import Empty, SimpleQueue
+
+from batch import open_pool, replace_pool
+from budgets import add_budget_arguments, apply_budget_arguments
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional: without watchdog the folder is polled
+    FileSystemEventHandler = object
+    Observer = None
+
+# ----------------------------- Drop-folder watching -----------------------------
+# Watch a folder tree and hand each new or changed file to the pipeline as soon as it
+# has finished arriving. Filesystem events come from watchdog when it is installed;
+# otherwise the tree is polled, listing only directories whose mtime changed and
+# checking the size and mtime of the files already seen, which a rewrite in place
+# changes without touching the directory. A file
+# counts as arrived once its size and mtime have not changed for DEBOUNCE_SECONDS and
+# it can be opened, so half-copied files are never processed.
+
+DEBOUNCE_SECONDS = 2.0
+POLL_SECONDS = 1.0
+TICK_SECONDS = 0.2
+# Editors, browsers and copy tools write to these before renaming to the real name
+TEMPORARY_PREFIXES = ('~$', '.')
+TEMPORARY_SUFFIXES = ('.tmp', '.part', '.crdownload', '.partial', '.swp')
+# A directory modified this recently is listed again even if its mtime looks unchanged,
+# since a second file created within the filesystem's timestamp resolution would not move it
+RACY_SECONDS = 2.0
+
+
+def iter_files(root, extensions=None):
+    """Yield every file under `root` as a DirEntry, recursively, using os.scandir."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file() and _wanted(entry.name, extensions):
+                        yield entry
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+
+def _wanted(name, extensions):
+    if name.startswith(TEMPORARY_PREFIXES) or name.lower().endswith(TEMPORARY_SUFFIXES):
+        return False
+    return extensions is None or os.path.splitext(name)[1].lower() in extensions
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, events):
+        self.events = events
+
+    def on_any_event(self, event):
+        if event.event_type in ('created', 'modified', 'moved', 'closed'):
+            path = getattr(event, 'dest_path', None) or event.src_path
+            self.events.put((path, event.is_directory))
+
+
+class DropFolder:
+    """Tracks a folder tree and reports files that have finished arriving.
+
+    `skip(path)` may return True for files that need no processing (already done in an
+    earlier run). Files present at start are reported too, unless skipped.
+    """
+
+    def __init__(self, root, extensions=None, skip=None, debounce=DEBOUNCE_SECONDS, poll=POLL_SECONDS,
+                 use_events=True):
+        self.root = os.path.abspath(root)
+        self.extensions = set(extensions) if extensions is not None else None
+        self.skip = skip
+        self.debounce = debounce
+        self.poll = poll
+        self.seen = {}  # path -> (size, mtime_ns) when last handed out or skipped
+        self.candidates = {}  # path -> ((size, mtime_ns), monotonic time it last changed)
+        self._dirs = {}  # directory -> (mtime_ns, subdirectories), for polling
+        self._events = SimpleQueue()
+        self._observer = None
+        self._next_poll = 0.0
+        if use_events and Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self._events), self.root, recursive=True)
+
+    def start(self):
+        if self._observer is not None:
+            self._observer.start()
+        # Initial discovery; when polling, this also primes the directory cache
+        if self._observer is None:
+            paths = self._list_changed_dirs()
+        else:
+            paths = [entry.path for entry in iter_files(self.root, self.extensions)]
+        for path in paths:
+            self._consider(path)
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+
+    def _consider(self, path):
+        if path not in self.candidates and _wanted(os.path.basename(path), self.extensions):
+            self.candidates[path] = (None, time.monotonic())
+
+    def _list_changed_dirs(self):
+        """Files in directories whose listing changed since the last call, and seen files that changed."""
+        found = []
+        stack = [self.root]
+        now = time.time_ns()
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                self._dirs.pop(directory, None)
+                continue
+            cached = self._dirs.get(directory)
+            if cached and cached[0] == mtime and now - mtime > RACY_SECONDS * 1e9:
+                stack.extend(cached[1])
+                continue
+            subdirs = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file() and _wanted(entry.name, self.extensions):
+                            stat = entry.stat()
+                            if self.seen.get(entry.path) != (stat.st_size, stat.st_mtime_ns):
+                                found.append(entry.path)
+            except (FileNotFoundError, NotADirectoryError, PermissionError):
+                continue
+            self._dirs[directory] = (mtime, subdirs)
+            stack.extend(subdirs)
+        listed = set(found)
+        for path, signature in list(self.seen.items()):
+            if path in listed:
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                del self.seen[path]  # listed again if it comes back
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != signature:
+                found.append(path)
+        return found
+
+    def _collect(self):
+        if self._observer is None:
+            if time.monotonic() >= self._next_poll:
+                for path in self._list_changed_dirs():
+                    self._consider(path)
+                self._next_poll = time.monotonic() + self.poll
+            return
+        while True:
+            try:
+                path, is_directory = self._events.get_nowait()
+            except Empty:
+                return
+            if is_directory:
+                # A folder moved in arrives as one event; its files need listing
+                for entry in iter_files(path, self.extensions):
+                    self._consider(entry.path)
+            else:
+                self._consider(path)
+
+    def ready(self):
+        """Collect new events and return the files that have finished arriving."""
+        self._collect()
+        now = time.monotonic()
+        ready = []
+        for path, (signature, changed) in list(self.candidates.items()):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                del self.candidates[path]  # moved away or deleted before it settled
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if self.seen.get(path) == current:
+                del self.candidates[path]  # an event for a file already handed out
+                continue
+            if current != signature:
+                self.candidates[path] = (current, now)
+                continue
+            if now - changed < self.debounce:
+                continue
+            try:
+                with open(path, 'rb'):
+                    pass  # still locked by the writer on Windows
+            except OSError:
+                self.candidates[path] = (current, now)
+                continue
+            del self.candidates[path]
+            self.seen[path] = current
+            if self.skip is None or not self.skip(path):
+                ready.append(path)
+        return sorted(ready)
+
+
+def watch_folder(root, func, on_result, extensions=None, skip=None, workers=None, preload_ocr=None, gpu=False,
+                 stop=None, debounce=DEBOUNCE_SECONDS, poll=POLL_SECONDS):
+    """Run `func(path)` on every file that arrives under `root` until `stop` is set.
+
+    Files go to a warm process pool as soon as they settle; `on_result(path, result)` is
+    called on this thread as each finishes, with None when `func` raised. Files already
+    under `root` are processed first, except those `skip(path)` rejects. A worker that
+    dies fails the files in flight with it (None) and the pool is replaced.
+    """
+    stop = stop or threading.Event()
+    folder = DropFolder(root, extensions=extensions, skip=skip, debounce=debounce, poll=poll)
+    mode = "filesystem events" if folder._observer is not None else f"polling every {poll:g}s"
+    print(f"[INFO] Watching {folder.root} ({mode})")
+    folder.start()
+    pending = {}  # future -> (path, pool it runs on)
+    pool = open_pool(workers, preload_ocr, gpu)
+
+    def replace(broken):
+        nonlocal pool
+        if pool is broken:  # not yet replaced for an earlier file of the same pool
+            pool = replace_pool(broken, workers, preload_ocr, gpu)
+
+    def submit(path):
+        submitted_to = pool
+        try:
+            pending[submitted_to.submit(func, path)] = (path, submitted_to)
+        except BrokenProcessPool:
+            replace(submitted_to)
+            pending[pool.submit(func, path)] = (path, pool)
+
+    def finish(futures):
+        for future in futures:
+            path, ran_on = pending.pop(future)
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                print(f"[ERROR] Worker died while processing: {path}\n{e}")
+                replace(ran_on)
+                result = None
+            except Exception as e:
+                print(f"[ERROR] Failed to process: {path}\n{e}")
+                result = None
+            on_result(path, result)
+
+    try:
+        try:
+            while not stop.is_set():
+                for path in folder.ready():
+                    submit(path)
+                finish([future for future in pending if future.done()])
+                stop.wait(TICK_SECONDS)
+        except KeyboardInterrupt:
+            pass
+        if pending:
+            print(f"[INFO] Stopping after the {len(pending)} files in progress...")
+        finish(list(pending))
+    finally:
+        pool.shutdown()
+        folder.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="watch", description="Process documents as they land in a drop folder.")
+    parser.add_argument("task", choices=["pii", "lease"], help="pipeline to feed")
+    parser.add_argument("folder", help="drop folder to watch, including subfolders")
+    parser.add_argument("--out", required=True,
+                        help="PII: output CSV (rows are appended). Lease: output folder for results.jsonl and summary.csv")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: one per CPU core)")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS,
+                        help=f"seconds a file must stay unchanged before it is processed (default: {DEBOUNCE_SECONDS:g})")
+    add_budget_arguments(parser)
+    args = parser.parse_args(argv)
+    apply_budget_arguments(args)
+
+    # Runs until interrupted with Ctrl+C
+    if args.task == "pii":
+        import pii_scan
+        pii_scan.watch_to_csv(args.folder, args.out, workers=args.workers, debounce=args.debounce)
+    else:
+        import lease_analytics
+        lease_analytics.watch_folder(args.folder, args.out, workers=args.workers, debounce=args.debounce)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())